@@ -128,7 +128,7 @@ async def export_data(format: str, file_path: str) -> Dict[str, str]:
     Export data to specified format.
     
     Args:
-        format: Export format (csv, excel, json)
+        format: Export format (csv, excel, json, parquet)
         file_path: Path where the file will be saved
         
     Returns:
@@ -138,17 +138,8 @@ async def export_data(format: str, file_path: str) -> Dict[str, str]:
         if data_processor.data is None:
             raise ExportError("No data to export")
         
-        export_service.set_data(data_processor.data)
-        
-        if format == "csv":
-            export_service.export_to_csv(file_path)
-        elif format == "excel":
-            export_service.export_to_excel(file_path)
-        elif format == "json":
-            export_service.export_to_json(file_path)
-        else:
-            raise ExportError(f"Unsupported export format: {format}")
+        export_service.export(data_processor.data, file_path, format)
         
         return {"message": f"Data exported successfully to {file_path}"}
-    except ExportError as e:
+    except (ExportError, PermissionError) as e:
         raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
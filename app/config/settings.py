@@ -1,6 +1,7 @@
 """
 Application settings and configuration management.
 """
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 from pydantic_settings import BaseSettings
@@ -85,12 +86,13 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
+@lru_cache(maxsize=1)
+def get_settings():
+    return Settings()
+
 # Create settings instance
-settings = Settings()
+settings = get_settings()
 
 # Create necessary directories
 for path in [settings.EXPORT_DIR, settings.LOG_FILE.parent]:
     path.mkdir(parents=True, exist_ok=True)
-
-def get_settings():
-    return settings 
\ No newline at end of file
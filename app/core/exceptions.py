@@ -10,8 +10,8 @@ class DataProcessingError(Exception):
     """Raised when there is an error processing data."""
     pass
 
-class ExportError(Exception):
-    """Raised when there is an error exporting data."""
+class ExportError(ValueError):
+    """Raised when there is an error exporting data, or data that cannot be exported."""
     pass
 
 class AuthenticationError(Exception):
@@ -2,7 +2,10 @@
 Dashboard module for data visualization and reporting.
 """
 
+import os
 import pandas as pd
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Any
 from app.core.exceptions import DataProcessingError
 from app.services.analytics import (
@@ -97,12 +100,43 @@ def generate_product_dashboard(data: pd.DataFrame, dept_id: int) -> Dict[str, An
     except Exception as e:
         raise DataProcessingError(f"Error generating product dashboard: {str(e)}")
 
-def load_data(file_path: str) -> pd.DataFrame:
+def create_customer_analysis(data: pd.DataFrame) -> Dict[str, pd.Series]:
     """
-    Load data from a CSV file into a pandas DataFrame.
+    Break down transactions by customer type, gender and payment method.
+    
+    Args:
+        data: DataFrame containing sales data
+        
+    Returns:
+        Dictionary of transaction counts per group, each indexed by a CategoricalIndex
+    """
+    try:
+        return {
+            "customer_type_breakdown": data['Customer type'].astype("category").value_counts(sort=False),
+            "gender_breakdown": data['Gender'].astype("category").value_counts(sort=False),
+            "payment_method_breakdown": data['Payment'].astype("category").value_counts(sort=False)
+        }
+    except Exception as e:
+        raise DataProcessingError(f"Error generating customer analysis: {str(e)}")
+
+@lru_cache(maxsize=8)
+def _read_data(file_path: str, mtime: float, engine: str) -> pd.DataFrame:
+    """
+    Read a data file, cached on its path, modification time and CSV engine.
+    """
+    if Path(file_path).suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(file_path)
+    return pd.read_csv(file_path, engine=engine)
+
+def load_data(file_path: str, engine: str = "c") -> pd.DataFrame:
+    """
+    Load data from a CSV or Excel file into a pandas DataFrame.
+    
+    CSV files are parsed with the default pandas parser; pass
+    engine="pyarrow" to opt into the pyarrow parser. Parsed files are cached
+    until they change on disk; callers get a copy.
     """
     try:
-        df = pd.read_csv(file_path)
-        return df
+        return _read_data(file_path, os.path.getmtime(file_path), engine).copy()
     except Exception as e:
-        raise Exception(f"Error loading data: {str(e)}") 
\ No newline at end of file
+        raise Exception(f"Error loading data: {str(e)}")
\ No newline at end of file
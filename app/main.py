@@ -6,12 +6,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from contextlib import asynccontextmanager
 import time
 from app.api.routes import router as api_router
 from app.config.settings import settings
 from app import logger
 from app.models.database import engine, Base
 
+# Create database tables on startup
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create database tables on startup."""
+    try:
+        Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created successfully")
+    except Exception as e:
+        logger.error(f"Error creating database tables: {e}")
+        raise
+    yield
+
 # Create FastAPI app
 app = FastAPI(
     title="Walmart Sales Analytics API",
@@ -19,7 +32,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -61,17 +75,6 @@ templates = Jinja2Templates(directory=settings.TEMPLATES_DIR)
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
-# Create database tables
-@app.on_event("startup")
-async def startup_event():
-    """Create database tables on startup."""
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
-        raise
-
 # Health check endpoint
 @app.get("/health")
 async def health_check():
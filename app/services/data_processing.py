@@ -70,4 +70,24 @@ class DataProcessor:
             return False
         # Example validation: check for required columns
         required_columns = ['date', 'total', 'customer_type']
-        return all(col in df.columns for col in required_columns) 
\ No newline at end of file
+        return all(col in df.columns for col in required_columns) 
+
+def aggregate_data(df: pd.DataFrame, group_by: str) -> pd.DataFrame:
+    """
+    Aggregate sales totals by a grouping column.
+    
+    Args:
+        df: DataFrame containing sales data
+        group_by: Column to group by, e.g. 'Branch' or 'Product line'
+        
+    Returns:
+        DataFrame with total_sales, total_transactions and average_transaction per group
+    """
+    try:
+        return (
+            df.groupby(group_by, observed=True, sort=False)['Total']
+            .agg(total_sales='sum', total_transactions='count', average_transaction='mean')
+            .reset_index()
+        )
+    except Exception as e:
+        raise DataProcessingError(f"Error aggregating data: {str(e)}")
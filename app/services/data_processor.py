@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from typing import Optional, List, Dict, Any
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 from app.models.database import Sale, get_db
 from app.models.schemas import SaleCreate, SaleUpdate
@@ -16,6 +17,9 @@ from app.config.settings import settings
 # Initialize Redis client
 redis_client = redis.from_url(settings.REDIS_URL)
 
+# Sale fields populated from a cleaned DataFrame, read once from the schema
+SALE_COLUMNS = list(SaleCreate.model_fields)
+
 class DataProcessor:
     """Data processing service for sales data."""
     
@@ -34,7 +38,7 @@ class DataProcessor:
                 "unit_price_positive": dataset.expect_column_values_to_be_between("unit_price", 0, None),
                 "quantity_positive": dataset.expect_column_values_to_be_between("quantity", 1, None),
                 "total_positive": dataset.expect_column_values_to_be_between("total", 0, None),
-                "date_valid": dataset.expect_column_values_to_be_datetime("date"),
+                "date_valid": dataset.expect_column_values_to_be_of_type("date", "datetime64"),
                 "time_valid": dataset.expect_column_values_to_match_regex("time", r"^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$"),
                 "rating_range": dataset.expect_column_values_to_be_between("rating", 0, 10, mostly=0.95)
             }
@@ -115,31 +119,23 @@ class DataProcessor:
                 logger.warning("Data validation failed")
                 return validation_results
             
-            # Convert to database models
-            sales_data = []
-            for _, row in df_clean.iterrows():
-                sale = Sale(
-                    invoice_id=row['invoice_id'],
-                    branch=row['branch'],
-                    city=row['city'],
-                    customer_type=row['customer_type'],
-                    gender=row['gender'],
-                    product_line=row['product_line'],
-                    unit_price=float(row['unit_price']),
-                    quantity=int(row['quantity']),
-                    total=float(row['total']),
-                    date=row['date'],
-                    time=row['time'],
-                    payment=row['payment'],
-                    cogs=float(row['cogs']),
-                    gross_margin_percentage=float(row['gross_margin_percentage']),
-                    gross_income=float(row['gross_income']),
-                    rating=float(row['rating']) if 'rating' in row else None
-                )
-                sales_data.append(sale)
-            
-            # Store in database
-            db.bulk_save_objects(sales_data)
+            # Convert to plain records, casting each column once
+            casts = {
+                'unit_price': float,
+                'quantity': int,
+                'total': float,
+                'cogs': float,
+                'gross_margin_percentage': float,
+                'gross_income': float
+            }
+            if 'rating' in df_clean.columns:
+                casts['rating'] = float
+            else:
+                df_clean = df_clean.assign(rating=None)
+            sales_data = df_clean.astype(casts)[SALE_COLUMNS].to_dict('records')
+            
+            # Store in database with a single executemany INSERT
+            db.execute(insert(Sale), sales_data)
             db.commit()
             
             # Cache results
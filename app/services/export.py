@@ -2,9 +2,14 @@
 Export service for handling data export operations.
 """
 
+import os
 import pandas as pd
-from typing import Dict, Any, Optional
+from datetime import datetime
+from openpyxl import Workbook
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.orm import Session
 from app.core.exceptions import ExportError
+from app.models.database import Sale
 
 class ExportService:
     """Service for exporting data to various formats."""
@@ -32,25 +37,20 @@ class ExportService:
         if self.data is None:
             raise ExportError("No data to export")
         
-        try:
-            self.data.to_csv(file_path, index=False)
-        except Exception as e:
-            raise ExportError(f"Error exporting to CSV: {str(e)}")
+        export_to_csv(self.data, file_path)
     
-    def export_to_excel(self, file_path: str) -> None:
+    def export_to_excel(self, file_path: str, sheet_name: str = "Sheet1") -> None:
         """
         Export data to Excel format.
         
         Args:
             file_path: Path where the Excel file will be saved
+            sheet_name: Name of the worksheet to write
         """
         if self.data is None:
             raise ExportError("No data to export")
         
-        try:
-            self.data.to_excel(file_path, index=False)
-        except Exception as e:
-            raise ExportError(f"Error exporting to Excel: {str(e)}")
+        export_to_excel(self.data, file_path, sheet_name=sheet_name)
     
     def export_to_json(self, file_path: str) -> None:
         """
@@ -62,10 +62,55 @@ class ExportService:
         if self.data is None:
             raise ExportError("No data to export")
         
-        try:
-            self.data.to_json(file_path, orient='records')
-        except Exception as e:
-            raise ExportError(f"Error exporting to JSON: {str(e)}")
+        export_to_json(self.data, file_path)
+    
+    def export_to_parquet(self, file_path: str) -> None:
+        """
+        Export data to Parquet format.
+        
+        Args:
+            file_path: Path where the Parquet file will be saved
+        """
+        if self.data is None:
+            raise ExportError("No data to export")
+        
+        export_to_parquet(self.data, file_path)
+    
+    def export(self, data: pd.DataFrame, file_path: str, format: str = "csv", **kwargs: Any) -> None:
+        """
+        Export data to the given format.
+        
+        The data is passed straight to the format's handler rather than
+        stored on the service, so concurrent exports do not share state.
+        
+        Args:
+            data: DataFrame containing the data to export
+            file_path: Path where the file will be saved
+            format: Export format (csv, excel, json, parquet)
+            **kwargs: Format options passed to the handler, e.g. delimiter,
+                sheet_name or orient
+        
+        Raises:
+            ExportError: If the format is unsupported, the data is empty or
+                the handler fails
+            PermissionError: If the target is known not to be writable
+        """
+        handler = EXPORT_HANDLERS.get(format)
+        if handler is None:
+            raise ExportError(f"Unsupported export format: {format}")
+        if data is None or data.empty:
+            raise ExportError("No data to export")
+        
+        # Best-effort fail-fast on unwritable targets, before any serialization
+        # work. The check can race with the write and always passes for root,
+        # so the handler's own write errors remain the real guard.
+        directory = os.path.dirname(os.path.abspath(file_path))
+        if (os.path.isdir(directory) and not os.access(directory, os.W_OK)) or (
+            os.path.exists(file_path) and not os.access(file_path, os.W_OK)
+        ):
+            raise PermissionError(f"Cannot write to {file_path}")
+        
+        handler(data, file_path, **kwargs)
     
     def get_export_formats(self) -> Dict[str, Any]:
         """
@@ -86,11 +131,48 @@ class ExportService:
             "json": {
                 "description": "JavaScript Object Notation format",
                 "extension": ".json"
+            },
+            "parquet": {
+                "description": "Apache Parquet columnar format",
+                "extension": ".parquet"
             }
         }
 
-def export_to_database(*args, **kwargs):
-    return True
+# Sale fields filled from exported frames; the key and timestamps are set here
+SALE_EXPORT_COLUMNS = [
+    c.name for c in Sale.__table__.columns
+    if c.name not in ("id", "created_at", "updated_at")
+]
+
+def export_to_database(df: pd.DataFrame, db: Session, chunksize: int = 1000) -> bool:
+    """
+    Append DataFrame rows to the sales table with multi-row INSERTs.
+    
+    Column names such as 'Invoice ID' are mapped to the matching Sale
+    fields; columns with no Sale field, such as 'Tax 5%', are dropped.
+    Rows are written on the session's connection, so they are part of its
+    transaction; committing or rolling back is left to the caller.
+    """
+    try:
+        now = datetime.utcnow()
+        columns = {c.lower().replace(' ', '_'): c for c in df.columns}
+        mapping = {
+            columns[name]: name for name in SALE_EXPORT_COLUMNS if name in columns
+        }
+        rows = df[list(mapping)].rename(columns=mapping)
+        rows = rows.assign(created_at=now, updated_at=now)
+        rows.to_sql(
+            Sale.__tablename__,
+            db.connection(),
+            if_exists='append',
+            index=False,
+            method='multi',
+            chunksize=chunksize
+        )
+        return True
+    except Exception as e:
+        raise ExportError(f"Error exporting data to database: {str(e)}")
+
 def export_service_pipeline(*args, **kwargs):
     return True
 def export_with_filters(*args, **kwargs):
@@ -100,12 +182,63 @@ def export_with_custom_columns(*args, **kwargs):
 def export_with_formatting(*args, **kwargs):
     return True
 
-def export_to_csv(df: pd.DataFrame, file_path: str) -> bool:
+def export_to_csv(df: pd.DataFrame, file_path: str, delimiter: str = ",", **kwargs: Any) -> bool:
     """
-    Export DataFrame to a CSV file.
+    Export DataFrame to a CSV file; extra options go to DataFrame.to_csv.
     """
     try:
-        df.to_csv(file_path, index=False)
+        df.to_csv(file_path, sep=delimiter, index=False, **kwargs)
         return True
     except Exception as e:
-        raise Exception(f"Error exporting data to CSV: {str(e)}") 
\ No newline at end of file
+        raise ExportError(f"Error exporting data to CSV: {str(e)}")
+
+def export_to_excel(df: pd.DataFrame, file_path: str, sheet_name: str = "Sheet1") -> bool:
+    """
+    Export DataFrame to an Excel file, streaming rows in write-only mode.
+    
+    Each column is converted to Python values once, with missing values
+    as empty cells, so rows are appended without per-cell conversion.
+    """
+    try:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(sheet_name)
+        ws.append([str(c) for c in df.columns])
+        columns = [
+            col.astype(object).where(col.notna(), None).tolist()
+            for _, col in df.items()
+        ]
+        for row in zip(*columns):
+            ws.append(row)
+        wb.save(file_path)
+        return True
+    except Exception as e:
+        raise ExportError(f"Error exporting data to Excel: {str(e)}")
+
+def export_to_json(df: pd.DataFrame, file_path: str, orient: str = "records", **kwargs: Any) -> bool:
+    """
+    Export DataFrame to a JSON file, as a list of records by default;
+    extra options go to DataFrame.to_json.
+    """
+    try:
+        df.to_json(file_path, orient=orient, default_handler=str, **kwargs)
+        return True
+    except Exception as e:
+        raise ExportError(f"Error exporting data to JSON: {str(e)}")
+
+def export_to_parquet(df: pd.DataFrame, file_path: str, compression: str = "snappy", **kwargs: Any) -> bool:
+    """
+    Export DataFrame to a Parquet file; extra options go to DataFrame.to_parquet.
+    """
+    try:
+        df.to_parquet(file_path, engine="pyarrow", compression=compression, index=False, **kwargs)
+        return True
+    except Exception as e:
+        raise ExportError(f"Error exporting data to Parquet: {str(e)}")
+
+# Export function for each format supported by ExportService.export
+EXPORT_HANDLERS: Dict[str, Callable[..., bool]] = {
+    "csv": export_to_csv,
+    "excel": export_to_excel,
+    "json": export_to_json,
+    "parquet": export_to_parquet
+}
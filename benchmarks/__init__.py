@@ -0,0 +1,3 @@
+"""
+Airspeed velocity benchmarks for the application.
+"""
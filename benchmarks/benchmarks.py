@@ -0,0 +1,61 @@
+"""
+Timing benchmarks for the ingestion, analytics and export services.
+
+Run with ``asv continuous main HEAD --factor 1.2`` to flag regressions of
+more than 20% between the main branch and the working copy.
+"""
+import os
+import shutil
+import tempfile
+import pandas as pd
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from app.models.database import Base, Sale
+from app.services.data_processor import DataProcessor
+from app.services.analytics import Analytics
+from app.services.export import ExportService
+from .datasets import generate_large_dataset
+
+class TimeSuite:
+    """Time the service layer against a 10k-row SQLite database."""
+    params = [10000]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmpdir, 'bench.db')}")
+        Base.metadata.create_all(self.engine)
+        self.df = generate_large_dataset(rows).rename(columns=lambda c: c.lower().replace(' ', '_'))
+        self.db = Session(self.engine)
+        self.db.execute(insert(Sale), self.df.assign(date=pd.to_datetime(self.df['date'])).to_dict('records'))
+        self.db.commit()
+        self.data = pd.read_sql(select(Sale), self.db.connection())
+
+    def teardown(self, rows):
+        self.db.close()
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def time_process_sales_data(self, rows):
+        self.db.query(Sale).delete()
+        self.db.commit()
+        DataProcessor.process_sales_data(self.df, self.db)
+
+    def time_time_series(self, rows):
+        Analytics().get_time_series_data(self.db)
+
+    def time_product_analysis(self, rows):
+        Analytics().get_product_analysis(self.db)
+
+    def time_customer_analysis(self, rows):
+        Analytics().get_customer_analysis(self.db)
+
+    def time_export_excel(self, rows):
+        ExportService().export(self.data, os.path.join(self.tmpdir, 'export.xlsx'), format='excel')
+
+    def time_export_parquet(self, rows):
+        ExportService().export(self.data, os.path.join(self.tmpdir, 'export.parquet'), format='parquet')
+
+    def time_query(self, rows):
+        for _ in self.db.execute(select(Sale)).yield_per(1000).scalars():
+            pass
@@ -0,0 +1,29 @@
+"""
+Synthetic sales datasets shared by the asv benchmarks and the performance tests.
+"""
+import numpy as np
+import pandas as pd
+
+def generate_large_dataset(size=10000):
+    """Generate a large dataset for performance testing."""
+    i = np.arange(size)
+    step = i % 10 + 1
+    data = {
+        'Invoice ID': np.char.add('INV', np.char.zfill(i.astype(str), 6)),
+        'Branch': np.take(['A', 'B', 'C'], i % 3),
+        'City': np.char.add('City', (i % 10 + 1).astype(str)),
+        'Customer type': np.take(['Member', 'Normal'], i % 2),
+        'Gender': np.take(['Male', 'Female'], i % 2),
+        'Product line': np.char.add('Product', (i % 5 + 1).astype(str)),
+        'Unit price': 10.0 * step,
+        'Quantity': step,
+        'Total': 10.0 * step * step,
+        'Date': (pd.Timestamp(2023, 1, 1) + pd.to_timedelta(i % 365, unit='D')).strftime('%Y-%m-%d'),
+        'Time': np.char.add(np.char.zfill((i % 24).astype(str), 2), ':00'),
+        'Payment': np.take(['Cash', 'Credit card', 'E-wallet'], i % 3),
+        'cogs': 5.0 * step * step,
+        'gross margin percentage': np.full(size, 0.5),
+        'gross income': 5.0 * step * step,
+        'Rating': 4.0 + (i % 10) / 10
+    }
+    return pd.DataFrame(data)
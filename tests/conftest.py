@@ -1,16 +1,111 @@
 """
 Test fixtures for the application.
 """
+import os
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import numpy as np
+import pandas as pd
+from contextlib import asynccontextmanager
+from pathlib import Path
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 from app.models.database import Base
-from app.config.settings import Settings
+from app.config.settings import Settings, settings as app_settings
 from fastapi.testclient import TestClient
 from app.main import app
+from app.api.main import app as api_app
+from app.dashboard.main import load_data
 
-# Test database URL
-TEST_DATABASE_URL = "sqlite:///./test.db"
+# Test database URL, one SQLite file per pytest-xdist worker
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+TEST_DATABASE_URL = f"sqlite:///./test_{XDIST_WORKER}.db" if XDIST_WORKER else "sqlite:///./test.db"
+
+# Sample data files
+SAMPLE_DATA_DIR = Path(__file__).parent / "data"
+
+# Low-cardinality columns stored as category dtype
+CATEGORY_COLUMNS = ("Branch", "City", "Customer type", "Gender", "Product line", "Payment")
+
+# Seed for synthetic test data
+TEST_RNG_SEED = 42
+
+# Fixed JWT signing key for tests
+TEST_SECRET_KEY = "x" * 32
+
+# Minimum bcrypt cost; hashes stay verifiable but take ~1ms instead of ~100ms
+TEST_BCRYPT_ROUNDS = 4
+
+# Schema DDL rendered once, so table setup skips create_all's inspection
+SCHEMA_DDL = [
+    str(ddl.compile(dialect=sqlite.dialect())).strip()
+    for table in Base.metadata.sorted_tables
+    for ddl in [CreateTable(table, if_not_exists=True)] + [
+        CreateIndex(index, if_not_exists=True) for index in table.indexes
+    ]
+]
+
+def pytest_addoption(parser):
+    """Add the --slow option for opting into slow tests."""
+    parser.addoption("--slow", action="store_true", default=False, help="run tests marked as slow")
+
+def pytest_configure(config):
+    """Register custom markers."""
+    config.addinivalue_line("markers", "slow: slow test, skipped unless --slow is given")
+    config.addinivalue_line("markers", "no_pandas: test builds no DataFrames")
+    config.addinivalue_line("markers", "parallel: test shares no mutable state and can be spread across xdist workers")
+
+def pytest_collection_modifyitems(config, items):
+    """Skip slow tests unless --slow is given."""
+    if config.getoption("--slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="need --slow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+def create_schema(engine):
+    """Create any missing tables on a SQLite engine from the cached DDL."""
+    with engine.begin() as connection:
+        for statement in SCHEMA_DDL:
+            connection.execute(text(statement))
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run async tests on asyncio only."""
+    return "asyncio"
+
+@pytest.fixture
+def rng():
+    """Create a seeded PCG64 generator, fresh per test so synthetic data is reproducible."""
+    return np.random.default_rng(TEST_RNG_SEED)
+
+def enable_wal(engine):
+    """Put every connection of a file-backed SQLite engine into WAL mode.
+
+    WAL lets readers proceed while another connection writes, so threaded
+    tests run their queries concurrently instead of queueing on the file lock.
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+    return engine
+
+@pytest.fixture(scope="session")
+def wal():
+    """Provide the WAL-mode switch to modules with their own engine."""
+    return enable_wal
+
+@pytest.fixture(scope="session")
+def schema():
+    """Provide the cached schema builder to modules with their own engine."""
+    return create_schema
 
 @pytest.fixture(scope="session")
 def settings():
@@ -21,28 +116,149 @@ def settings():
         log_level="DEBUG"
     )
 
+@pytest.fixture(scope="session", autouse=True)
+def jwt_signing_key():
+    """Sign and verify all test tokens with one fixed HS256 key."""
+    from app.services import auth
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(auth, "SECRET_KEY", TEST_SECRET_KEY)
+        mp.setattr(auth, "ALGORITHM", "HS256")
+        mp.setattr(app_settings, "SECRET_KEY", TEST_SECRET_KEY)
+        yield
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Hash test passwords with the minimum bcrypt cost."""
+    from app.services import auth
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(auth, "pwd_context", CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=TEST_BCRYPT_ROUNDS
+        ))
+        yield
+
 @pytest.fixture(scope="session")
 def engine():
-    """Create test database engine."""
-    engine = create_engine(TEST_DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
+    """Create test database engine, reusing the most recently returned pooled connection."""
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_use_lifo=True,
+        pool_pre_ping=True
+    )
+    enable_wal(engine)
+    create_schema(engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
 def db(engine):
-    """Create test database session."""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    """Create test database session; committed objects keep their loaded state."""
+    TestingSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+    )
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+@pytest.fixture(scope="session")
+def memory_engine():
+    """Create a shared in-memory SQLite engine with working SAVEPOINTs."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    
+    # pysqlite manages transactions itself unless told not to, which breaks SAVEPOINT
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+    
+    create_schema(engine)
+    yield engine
+    engine.dispose()
+
 @pytest.fixture(scope="function")
+def savepoint_db(memory_engine):
+    """Create a session whose commits are SAVEPOINTs, rolled back after the test."""
+    connection = memory_engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield db
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+def sale_mappings(n):
+    """Build n sale rows, one per day from 2023-01-02, for bulk insertion."""
+    return [
+        {
+            "invoice_id": f"INV{i:03d}",
+            "branch": "A",
+            "city": "City1",
+            "customer_type": "Member",
+            "gender": "Male",
+            "product_line": "Product1",
+            "unit_price": 10.0,
+            "quantity": 2,
+            "total": 20.0,
+            "date": day.to_pydatetime(),
+            "time": "10:00",
+            "payment": "Cash",
+            "cogs": 10.0,
+            "gross_margin_percentage": 0.5,
+            "gross_income": 10.0,
+            "rating": 4.5
+        }
+        for i, day in enumerate(pd.date_range("2023-01-02", periods=n), start=1)
+    ]
+
+@pytest.fixture(scope="function")
+def seed_sales(db):
+    """Provide a factory inserting n sales in one Core INSERT: ``seed_sales(n, **overrides)``."""
+    from app.models.database import Sale
+    
+    def seed(n, **overrides):
+        rows = [{**row, **overrides} for row in sale_mappings(n)]
+        db.execute(insert(Sale), rows)
+        db.commit()
+        return rows
+    return seed
+
+@asynccontextmanager
+async def noop_lifespan(app):
+    """Skip application startup; tests create their own tables."""
+    yield
+
+@pytest.fixture(scope="session")
 def client():
-    """Create test client."""
-    return TestClient(app)
+    """Create test client, keeping one event loop and lifespan for the session."""
+    original_lifespan = app.router.lifespan_context
+    app.router.lifespan_context = noop_lifespan
+    try:
+        with TestClient(app) as c:
+            yield c
+    finally:
+        app.router.lifespan_context = original_lifespan
+
+@pytest.fixture(scope="session")
+def api_client():
+    """Create test client for the data analysis API."""
+    with TestClient(api_app) as c:
+        yield c
 
 @pytest.fixture(scope="function")
 def test_user(db):
@@ -58,7 +274,6 @@ def test_user(db):
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 @pytest.fixture(scope="function")
@@ -87,5 +302,98 @@ def test_sale(db):
     )
     db.add(sale)
     db.commit()
-    db.refresh(sale)
-    return sale 
\ No newline at end of file
+    return sale 
+
+def tile_frame(df, n):
+    """Repeat every row of a DataFrame n times, tiling category codes."""
+    return pd.DataFrame({
+        c: pd.Categorical.from_codes(np.tile(col.cat.codes, n), col.cat.categories)
+        if isinstance(col.dtype, pd.CategoricalDtype) else np.tile(col.values, n)
+        for c, col in df.items()
+    })
+
+@pytest.fixture(scope="session")
+def base_sample_data():
+    """Create the five-row sales sample shared across the session."""
+    df = pd.DataFrame({
+        'Invoice ID': ['INV001', 'INV002', 'INV003', 'INV004', 'INV005'],
+        'Branch': ['A', 'B', 'A', 'C', 'B'],
+        'City': ['City1', 'City2', 'City1', 'City3', 'City2'],
+        'Customer type': ['Member', 'Normal', 'Member', 'Member', 'Normal'],
+        'Gender': ['Male', 'Female', 'Male', 'Female', 'Male'],
+        'Product line': ['Product1', 'Product2', 'Product1', 'Product3', 'Product2'],
+        'Unit price': np.array([10.0, 15.0, 20.0, 25.0, 30.0], dtype=np.float64),
+        'Quantity': np.array([2, 1, 3, 2, 1], dtype=np.int64),
+        'Total': np.array([20.0, 15.0, 60.0, 50.0, 30.0], dtype=np.float64),
+        'Date': pd.date_range("2023-01-01", periods=5, freq="D"),
+        'Time': ['10:00', '11:00', '12:00', '13:00', '14:00'],
+        'Payment': ['Cash', 'Credit card', 'Cash', 'Credit card', 'Cash'],
+        'cogs': np.array([10.0, 7.5, 30.0, 25.0, 15.0], dtype=np.float64),
+        'gross margin percentage': np.full(5, 0.5),
+        'gross income': np.array([10.0, 7.5, 30.0, 25.0, 15.0], dtype=np.float64),
+        'Rating': np.array([4.5, 4.0, 5.0, 4.5, 4.0], dtype=np.float64)
+    })
+    for c in CATEGORY_COLUMNS:
+        df[c] = df[c].astype("category")
+    return df
+
+@pytest.fixture(params=[3, 5], ids=["small", "medium"])
+def sample_data(request, base_sample_data):
+    """Create sample data for testing: the first 3 or 5 rows of the shared sample.
+
+    Tests that depend on a specific size select it with
+    ``@pytest.mark.parametrize("sample_data", [n], indirect=True)``.
+    """
+    df = base_sample_data.head(request.param).copy()
+    for c in CATEGORY_COLUMNS:
+        df[c] = df[c].cat.remove_unused_categories()
+    return df
+
+@pytest.fixture(scope="session")
+def large_sample_data(base_sample_data):
+    """Tile the sample data to 5000 rows once per session; copy before mutating."""
+    return tile_frame(base_sample_data, 1000)
+
+@pytest.fixture(scope="session")
+def benchmark_sample_data(base_sample_data):
+    """Tile the sample data to 500k rows once per session for benchmarks; copy before mutating."""
+    return tile_frame(base_sample_data, 100_000)
+
+@pytest.fixture(scope="module")
+def pipeline_data():
+    """Create the two-sale raw dataset fed through the integration pipeline."""
+    return pd.DataFrame({
+        'Invoice ID': ['INV001', 'INV002'],
+        'Branch': ['A', 'B'],
+        'City': ['City1', 'City2'],
+        'Customer type': ['Member', 'Normal'],
+        'Gender': ['Male', 'Female'],
+        'Product line': ['Product1', 'Product2'],
+        'Unit price': [10.0, 20.0],
+        'Quantity': [2, 3],
+        'Total': [20.0, 60.0],
+        'Date': ['2023-01-01', '2023-01-02'],
+        'Time': ['10:00', '11:00'],
+        'Payment': ['Cash', 'Credit card'],
+        'cogs': [10.0, 30.0],
+        'gross margin percentage': [0.5, 0.5],
+        'gross income': [10.0, 30.0],
+        'Rating': [4.5, 4.0]
+    })
+
+@pytest.fixture(scope="session", params=["c", "pyarrow"])
+def loaded_csv(request):
+    """Load the sample CSV file once per session with each parser engine."""
+    return load_data(str(SAMPLE_DATA_DIR / "sample_sales.csv"), engine=request.param)
+
+@pytest.fixture(scope="session")
+def loaded_xlsx():
+    """Load the sample Excel file once, caching it as Parquet between runs."""
+    source = SAMPLE_DATA_DIR / "sample_sales.xlsx"
+    cache_path = SAMPLE_DATA_DIR / ".cache" / "sample_sales.parquet"
+    if cache_path.exists() and cache_path.stat().st_mtime >= source.stat().st_mtime:
+        return pd.read_parquet(cache_path)
+    data = load_data(str(source))
+    cache_path.parent.mkdir(exist_ok=True)
+    data.to_parquet(cache_path, index=False)
+    return data
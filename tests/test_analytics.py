@@ -15,26 +15,26 @@ from app.services.analytics import (
 )
 
 @pytest.fixture
-def sample_data():
+def sample_data(rng):
     """Create sample data for testing."""
     dates = [datetime(2023, 1, 1) + timedelta(days=i) for i in range(30)]
     return pd.DataFrame({
         'Invoice ID': [f'INV{i:03d}' for i in range(1, 31)],
-        'Branch': np.random.choice(['A', 'B', 'C'], 30),
-        'City': np.random.choice(['City1', 'City2', 'City3'], 30),
-        'Customer type': np.random.choice(['Member', 'Normal'], 30),
-        'Gender': np.random.choice(['Male', 'Female'], 30),
-        'Product line': np.random.choice(['Product1', 'Product2', 'Product3'], 30),
-        'Unit price': np.random.uniform(10, 100, 30),
-        'Quantity': np.random.randint(1, 5, 30),
-        'Total': np.random.uniform(20, 200, 30),
+        'Branch': rng.choice(['A', 'B', 'C'], 30),
+        'City': rng.choice(['City1', 'City2', 'City3'], 30),
+        'Customer type': rng.choice(['Member', 'Normal'], 30),
+        'Gender': rng.choice(['Male', 'Female'], 30),
+        'Product line': rng.choice(['Product1', 'Product2', 'Product3'], 30),
+        'Unit price': rng.uniform(10, 100, 30),
+        'Quantity': rng.integers(1, 5, 30),
+        'Total': rng.uniform(20, 200, 30),
         'Date': dates,
-        'Time': [f'{h:02d}:00' for h in np.random.randint(9, 18, 30)],
-        'Payment': np.random.choice(['Cash', 'Credit card', 'Debit card'], 30),
-        'cogs': np.random.uniform(10, 100, 30),
-        'gross margin percentage': np.random.uniform(0.4, 0.6, 30),
-        'gross income': np.random.uniform(10, 100, 30),
-        'Rating': np.random.uniform(3, 5, 30)
+        'Time': [f'{h:02d}:00' for h in rng.integers(9, 18, 30)],
+        'Payment': rng.choice(['Cash', 'Credit card', 'Debit card'], 30),
+        'cogs': rng.uniform(10, 100, 30),
+        'gross margin percentage': rng.uniform(0.4, 0.6, 30),
+        'gross income': rng.uniform(10, 100, 30),
+        'Rating': rng.uniform(3, 5, 30)
     })
 
 @pytest.fixture
@@ -267,8 +267,8 @@ def test_error_handling(analytics):
 
 def test_performance(analytics, sample_data):
     """Test performance of analytics."""
-    # Create a larger dataset
-    large_data = pd.concat([sample_data] * 100)
+    # Create a larger dataset by tiling each column
+    large_data = pd.DataFrame({c: np.tile(col.values, 100) for c, col in sample_data.items()})
     
     # Measure processing time
     import time
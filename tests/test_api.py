@@ -1,8 +1,8 @@
 """
 Tests for the API.
 """
+import os
 import pytest
-from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
@@ -12,15 +12,16 @@ from app.services.auth import create_access_token
 from app.models.schemas import UserCreate
 from app.services.auth import create_user
 
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Create test database, one SQLite file per pytest-xdist worker
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///./test_{XDIST_WORKER}.db" if XDIST_WORKER else "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def override_get_db():
-    """Override get_db for testing."""
+    """Override get_db for testing with a fresh session per request."""
+    db = TestingSessionLocal()
     try:
-        db = TestingSessionLocal()
         yield db
     finally:
         db.close()
@@ -28,13 +29,10 @@ def override_get_db():
 # Override get_db
 app.dependency_overrides[get_db] = override_get_db
 
-# Create test client
-client = TestClient(app)
-
 @pytest.fixture(scope="function")
-def db():
+def db(schema):
     """Create a fresh database for each test."""
-    Base.metadata.create_all(bind=engine)
+    schema(engine)
     db = TestingSessionLocal()
     try:
         yield db
@@ -76,13 +74,13 @@ def test_superuser_token(test_superuser):
     """Create a token for the test superuser."""
     return create_access_token(data={"sub": test_superuser.username})
 
-def test_health_check():
+def test_health_check(client):
     """Test health check endpoint."""
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
-def test_root():
+def test_root(client):
     """Test root endpoint."""
     response = client.get("/")
     assert response.status_code == 200
@@ -90,31 +88,25 @@ def test_root():
     assert "docs" in response.json()
     assert "version" in response.json()
 
-def test_login(test_user):
-    """Test login endpoint."""
+@pytest.mark.parametrize("password, status_code", [
+    ("testpass123", 200),
+    ("wrongpass", 401)
+])
+def test_login(client, test_user, password, status_code):
+    """Test login endpoint with correct and wrong passwords."""
     response = client.post(
         "/api/token",
         data={
             "username": test_user.username,
-            "password": "testpass123"
+            "password": password
         }
     )
-    assert response.status_code == 200
-    assert "access_token" in response.json()
-    assert response.json()["token_type"] == "bearer"
+    assert response.status_code == status_code
+    if status_code == 200:
+        assert "access_token" in response.json()
+        assert response.json()["token_type"] == "bearer"
 
-def test_login_wrong_password(test_user):
-    """Test login with wrong password."""
-    response = client.post(
-        "/api/token",
-        data={
-            "username": test_user.username,
-            "password": "wrongpass"
-        }
-    )
-    assert response.status_code == 401
-
-def test_create_user(test_superuser_token):
+def test_create_user(client, test_superuser_token):
     """Test creating a new user."""
     response = client.post(
         "/api/users/",
@@ -132,7 +124,7 @@ def test_create_user(test_superuser_token):
     assert response.json()["email"] == "new@example.com"
     assert "password" not in response.json()
 
-def test_create_user_unauthorized(test_user_token):
+def test_create_user_unauthorized(client, test_user_token):
     """Test creating a user without superuser privileges."""
     response = client.post(
         "/api/users/",
@@ -147,7 +139,7 @@ def test_create_user_unauthorized(test_user_token):
     )
     assert response.status_code == 403
 
-def test_update_user(test_superuser_token, test_user):
+def test_update_user(client, test_superuser_token, test_user):
     """Test updating a user."""
     response = client.put(
         f"/api/users/{test_user.id}",
@@ -161,7 +153,7 @@ def test_update_user(test_superuser_token, test_user):
     assert response.json()["email"] == "updated@example.com"
     assert response.json()["is_active"] == False
 
-def test_delete_user(test_superuser_token, test_user):
+def test_delete_user(client, test_superuser_token, test_user):
     """Test deleting a user."""
     response = client.delete(
         f"/api/users/{test_user.id}",
@@ -170,7 +162,7 @@ def test_delete_user(test_superuser_token, test_user):
     assert response.status_code == 200
     assert response.json()["message"] == "User deleted successfully"
 
-def test_delete_user_unauthorized(test_user_token, test_superuser):
+def test_delete_user_unauthorized(client, test_user_token, test_superuser):
     """Test deleting a user without superuser privileges."""
     response = client.delete(
         f"/api/users/{test_superuser.id}",
@@ -178,39 +170,32 @@ def test_delete_user_unauthorized(test_user_token, test_superuser):
     )
     assert response.status_code == 403
 
-def test_root_endpoint():
-    """Test the root endpoint."""
-    response = client.get("/")
-    assert response.status_code == 200
-    assert "message" in response.json()
-    assert "version" in response.json()
-
-def test_load_data_endpoint():
+def test_load_data_endpoint(client):
     """Test the data loading endpoint."""
     response = client.post("/data/load", json={"file_path": "test_data.csv"})
     assert response.status_code == 400  # Should fail as file doesn't exist
 
-def test_get_data_sample_endpoint():
+def test_get_data_sample_endpoint(client):
     """Test the data sample endpoint."""
     response = client.get("/data/sample")
     assert response.status_code == 400  # Should fail as no data is loaded
 
-def test_get_sales_trends_endpoint():
+def test_get_sales_trends_endpoint(client):
     """Test the sales trends endpoint."""
     response = client.get("/analytics/sales-trends")
     assert response.status_code == 400  # Should fail as no data is loaded
 
-def test_get_store_performance_endpoint():
+def test_get_store_performance_endpoint(client):
     """Test the store performance endpoint."""
     response = client.get("/analytics/store-performance")
     assert response.status_code == 400  # Should fail as no data is loaded
 
-def test_get_holiday_impact_endpoint():
+def test_get_holiday_impact_endpoint(client):
     """Test the holiday impact endpoint."""
     response = client.get("/analytics/holiday-impact")
     assert response.status_code == 400  # Should fail as no data is loaded
 
-def test_export_data_endpoint():
+def test_export_data_endpoint(client):
     """Test the data export endpoint."""
     response = client.post("/export/csv", json={"file_path": "test_export.csv"})
     assert response.status_code == 400  # Should fail as no data is loaded 
\ No newline at end of file
@@ -2,18 +2,30 @@
 API documentation tests for the application.
 """
 import pytest
-from app.api.main import app
-from fastapi.testclient import TestClient
+import asyncio
+import httpx
 import json
+from app.api.main import app
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def openapi_schema(api_client):
+    """Fetch and parse the OpenAPI schema once per module."""
+    return api_client.get("/openapi.json").json()
 
-def test_openapi_schema():
+@pytest.mark.anyio
+async def test_openapi_schema():
     """Test OpenAPI schema generation and structure."""
-    response = client.get("/openapi.json")
-    assert response.status_code == 200
-    
-    schema = response.json()
+    # Fetch the schema and the rendered docs pages concurrently
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            client.get("/openapi.json"),
+            client.get("/docs"),
+            client.get("/redoc")
+        )
+    assert all(response.status_code == 200 for response in responses)
+    
+    schema = responses[0].json()
     
     # Test basic schema structure
     assert "openapi" in schema
@@ -29,32 +41,29 @@ def test_openapi_schema():
     assert "version" in schema["info"]
     assert "description" in schema["info"]
 
-def test_api_endpoints_documentation():
+@pytest.mark.parametrize("path", [
+    # Authentication endpoints
+    "/auth/login",
+    "/auth/register",
+    "/auth/refresh",
+    # Sales endpoints
+    "/sales/overview",
+    "/sales/trends",
+    "/sales/products",
+    "/sales/customers",
+    "/sales/geography",
+    # Export endpoints
+    "/export/csv",
+    "/export/excel",
+    "/export/json"
+])
+def test_api_endpoints_documentation(openapi_schema, path):
     """Test API endpoints documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
-    
-    # Test authentication endpoints
-    assert "/auth/login" in schema["paths"]
-    assert "/auth/register" in schema["paths"]
-    assert "/auth/refresh" in schema["paths"]
-    
-    # Test sales endpoints
-    assert "/sales/overview" in schema["paths"]
-    assert "/sales/trends" in schema["paths"]
-    assert "/sales/products" in schema["paths"]
-    assert "/sales/customers" in schema["paths"]
-    assert "/sales/geography" in schema["paths"]
-    
-    # Test export endpoints
-    assert "/export/csv" in schema["paths"]
-    assert "/export/excel" in schema["paths"]
-    assert "/export/json" in schema["paths"]
+    assert path in openapi_schema["paths"]
 
-def test_endpoint_parameters():
+def test_endpoint_parameters(openapi_schema):
     """Test endpoint parameters documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
+    schema = openapi_schema
     
     # Test sales/trends endpoint parameters
     trends_path = schema["paths"]["/sales/trends"]
@@ -66,10 +75,9 @@ def test_endpoint_parameters():
     assert any(p["name"] == "end_date" for p in parameters)
     assert any(p["name"] == "branch" for p in parameters)
 
-def test_request_body_schemas():
+def test_request_body_schemas(openapi_schema):
     """Test request body schemas documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
+    schema = openapi_schema
     
     # Test login endpoint request body
     login_path = schema["paths"]["/auth/login"]
@@ -81,10 +89,9 @@ def test_request_body_schemas():
     assert "application/json" in request_body["content"]
     assert "schema" in request_body["content"]["application/json"]
 
-def test_response_schemas():
+def test_response_schemas(openapi_schema):
     """Test response schemas documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
+    schema = openapi_schema
     
     # Test sales/overview endpoint responses
     overview_path = schema["paths"]["/sales/overview"]
@@ -97,10 +104,9 @@ def test_response_schemas():
     assert "application/json" in responses["200"]["content"]
     assert "schema" in responses["200"]["content"]["application/json"]
 
-def test_security_schemes():
+def test_security_schemes(openapi_schema):
     """Test security schemes documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
+    schema = openapi_schema
     
     # Test security schemes
     assert "components" in schema
@@ -111,25 +117,23 @@ def test_security_schemes():
     assert security_schemes["bearerAuth"]["type"] == "http"
     assert security_schemes["bearerAuth"]["scheme"] == "bearer"
 
-def test_error_responses():
+@pytest.mark.parametrize("status_code", [
+    "400",  # Bad Request
+    "401",  # Unauthorized
+    "403",  # Forbidden
+    "404",  # Not Found
+    "500"   # Internal Server Error
+])
+def test_error_responses(openapi_schema, status_code):
     """Test error responses documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
-    
-    # Test common error responses
-    for path in schema["paths"].values():
+    for path in openapi_schema["paths"].values():
         for method in path.values():
             if "responses" in method:
-                assert "400" in method["responses"]  # Bad Request
-                assert "401" in method["responses"]  # Unauthorized
-                assert "403" in method["responses"]  # Forbidden
-                assert "404" in method["responses"]  # Not Found
-                assert "500" in method["responses"]  # Internal Server Error
+                assert status_code in method["responses"]
 
-def test_data_models():
+def test_data_models(openapi_schema):
     """Test data models documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
+    schema = openapi_schema
     
     # Test component schemas
     assert "components" in schema
@@ -141,10 +145,9 @@ def test_data_models():
     assert "Token" in schemas
     assert "TokenData" in schemas
 
-def test_examples():
+def test_examples(openapi_schema):
     """Test API examples documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
+    schema = openapi_schema
     
     # Test example values in schemas
     for path in schema["paths"].values():
@@ -155,10 +158,9 @@ def test_examples():
                     if "schema" in media_type:
                         assert "example" in media_type["schema"]
 
-def test_tags():
+def test_tags(openapi_schema):
     """Test API tags documentation."""
-    response = client.get("/openapi.json")
-    schema = response.json()
+    schema = openapi_schema
     
     # Test tags
     assert "tags" in schema
@@ -3,6 +3,7 @@ Tests for the authentication functionality.
 """
 import pytest
 from datetime import datetime, timedelta
+from functools import lru_cache
 from jose import jwt
 from passlib.context import CryptContext
 from app.services.auth import (
@@ -17,31 +18,43 @@ from app.services.auth import (
 from app.models.database import User
 from app.config.settings import settings
 
+@lru_cache(maxsize=None)
+def _access_token(username):
+    """Issue one access token per username and reuse it across tests."""
+    return create_access_token(data={"sub": username})
+
+@pytest.fixture(scope="session")
+def hashed_passwords(fast_password_hashing):
+    """Hash the test passwords once per session, at the reduced bcrypt cost."""
+    return {
+        password: get_password_hash(password)
+        for password in ("ComplexPass123!", "testpass123")
+    }
+
 @pytest.fixture
 def auth_service():
     """Create an AuthService instance."""
     return AuthService()
 
 @pytest.fixture
-def test_user(db):
+def test_user(db, hashed_passwords):
     """Create a test user."""
     user = User(
         username="testuser",
         email="test@example.com",
-        hashed_password=get_password_hash("testpass123"),
+        hashed_password=hashed_passwords["testpass123"],
         is_active=True,
         is_superuser=False
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
-def test_password_hashing():
+def test_password_hashing(hashed_passwords):
     """Test password hashing and verification."""
     # Test password hashing
     password = "testpass123"
-    hashed_password = get_password_hash(password)
+    hashed_password = hashed_passwords["testpass123"]
     assert hashed_password != password
     assert verify_password(password, hashed_password)
     
@@ -52,9 +65,7 @@ def test_password_hashing():
 def test_token_creation_and_validation(auth_service, test_user):
     """Test token creation and validation."""
     # Create access token
-    access_token = create_access_token(
-        data={"sub": test_user.username}
-    )
+    access_token = _access_token(test_user.username)
     assert access_token is not None
     
     # Decode token
@@ -68,16 +79,12 @@ def test_token_creation_and_validation(auth_service, test_user):
 
 def test_token_expiration(auth_service, test_user):
     """Test token expiration."""
-    # Create expired token
+    # Create token that is already expired
     expired_token = create_access_token(
         data={"sub": test_user.username},
-        expires_delta=timedelta(microseconds=1)
+        expires_delta=timedelta(minutes=-1)
     )
     
-    # Wait for token to expire
-    import time
-    time.sleep(0.1)
-    
     # Verify token is expired
     with pytest.raises(jwt.ExpiredSignatureError):
         jwt.decode(
@@ -97,7 +104,7 @@ def test_invalid_token(auth_service):
         )
     
     # Test tampered token
-    token = create_access_token(data={"sub": "testuser"})
+    token = _access_token("testuser")
     tampered_token = token[:-1] + "X"
     with pytest.raises(jwt.JWTError):
         jwt.decode(
@@ -125,7 +132,7 @@ def test_user_authentication(db, auth_service, test_user):
     )
     assert failed_user is False
 
-def test_password_policy():
+def test_password_policy(hashed_passwords):
     """Test password policy enforcement."""
     # Test password length
     short_password = "short"
@@ -138,8 +145,7 @@ def test_password_policy():
         get_password_hash(simple_password)
     
     # Test valid password
-    valid_password = "ComplexPass123!"
-    hashed_password = get_password_hash(valid_password)
+    hashed_password = hashed_passwords["ComplexPass123!"]
     assert hashed_password is not None
 
 def test_rate_limiting(auth_service, db, test_user):
@@ -165,35 +171,37 @@ def test_session_management(auth_service, test_user):
     # Test session expiration
     expired_session = auth_service.create_session_token(
         test_user,
-        expires_delta=timedelta(microseconds=1)
+        expires_delta=timedelta(minutes=-1)
     )
-    import time
-    time.sleep(0.1)
     with pytest.raises(jwt.ExpiredSignatureError):
         auth_service.verify_session_token(expired_session)
 
-def test_user_roles(auth_service, db):
+def test_user_roles(auth_service, db, hashed_passwords):
     """Test user role management."""
-    # Create regular user
-    regular_user = User(
-        username="regular",
-        email="regular@example.com",
-        hashed_password=get_password_hash("ComplexPass123!"),
-        is_active=True,
-        is_superuser=False
-    )
-    db.add(regular_user)
-    
-    # Create superuser
-    superuser = User(
-        username="admin",
-        email="admin@example.com",
-        hashed_password=get_password_hash("ComplexPass123!"),
-        is_active=True,
-        is_superuser=True
-    )
-    db.add(superuser)
+    # Create regular user and superuser in a single batch
+    db.bulk_insert_mappings(User, [
+        {
+            "username": "regular",
+            "email": "regular@example.com",
+            "hashed_password": hashed_passwords["ComplexPass123!"],
+            "is_active": True,
+            "is_superuser": False
+        },
+        {
+            "username": "admin",
+            "email": "admin@example.com",
+            "hashed_password": hashed_passwords["ComplexPass123!"],
+            "is_active": True,
+            "is_superuser": True
+        }
+    ])
     db.commit()
+    regular_user = db.query(User).filter(User.username == "regular").first()
+    superuser = db.query(User).filter(User.username == "admin").first()
+    
+    # Verify the stored roles
+    assert regular_user.is_superuser is False
+    assert superuser.is_superuser is True
     
     # Verify roles
     assert not auth_service.is_superuser(regular_user)
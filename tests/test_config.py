@@ -2,10 +2,19 @@
 Configuration tests for the application.
 """
 import pytest
-import os
+import io
+from dotenv import dotenv_values
+from pydantic_settings import InitSettingsSource
 from app.config.settings import Settings, get_settings
 from app.core.exceptions import ConfigurationError
 
+@pytest.fixture
+def clear_settings_cache():
+    """Reset the cached settings around tests that change the environment."""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
 def test_settings_initialization():
     """Test settings initialization."""
     settings = Settings()
@@ -19,16 +28,16 @@ def test_settings_initialization():
     assert settings.token_expire_minutes == 30
     assert settings.log_level == "INFO"
 
-def test_environment_variables():
+def test_environment_variables(monkeypatch):
     """Test environment variable configuration."""
     # Set test environment variables
-    os.environ["APP_NAME"] = "Test App"
-    os.environ["DEBUG"] = "true"
-    os.environ["API_VERSION"] = "2.0.0"
-    os.environ["DATABASE_URL"] = "sqlite:///test.db"
-    os.environ["SECRET_KEY"] = "test_secret"
-    os.environ["TOKEN_EXPIRE_MINUTES"] = "60"
-    os.environ["LOG_LEVEL"] = "DEBUG"
+    monkeypatch.setenv("APP_NAME", "Test App")
+    monkeypatch.setenv("DEBUG", "true")
+    monkeypatch.setenv("API_VERSION", "2.0.0")
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///test.db")
+    monkeypatch.setenv("SECRET_KEY", "test_secret")
+    monkeypatch.setenv("TOKEN_EXPIRE_MINUTES", "60")
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
     
     # Initialize settings
     settings = Settings()
@@ -41,13 +50,6 @@ def test_environment_variables():
     assert settings.secret_key == "test_secret"
     assert settings.token_expire_minutes == 60
     assert settings.log_level == "DEBUG"
-    
-    # Clean up environment variables
-    for key in [
-        "APP_NAME", "DEBUG", "API_VERSION", "DATABASE_URL",
-        "SECRET_KEY", "TOKEN_EXPIRE_MINUTES", "LOG_LEVEL"
-    ]:
-        os.environ.pop(key, None)
 
 def test_settings_validation():
     """Test settings validation."""
@@ -77,38 +79,32 @@ def test_settings_singleton():
     assert settings1.debug == settings2.debug
     assert settings1.api_version == settings2.api_version
 
-def test_development_settings():
+def test_development_settings(monkeypatch, clear_settings_cache):
     """Test development environment settings."""
-    os.environ["ENVIRONMENT"] = "development"
-    settings = Settings()
+    monkeypatch.setenv("ENVIRONMENT", "development")
+    settings = get_settings()
     
     assert settings.debug is True
     assert settings.log_level == "DEBUG"
     assert "dev" in settings.database_url.lower()
-    
-    os.environ.pop("ENVIRONMENT", None)
 
-def test_production_settings():
+def test_production_settings(monkeypatch, clear_settings_cache):
     """Test production environment settings."""
-    os.environ["ENVIRONMENT"] = "production"
-    settings = Settings()
+    monkeypatch.setenv("ENVIRONMENT", "production")
+    settings = get_settings()
     
     assert settings.debug is False
     assert settings.log_level == "INFO"
     assert "prod" in settings.database_url.lower()
-    
-    os.environ.pop("ENVIRONMENT", None)
 
-def test_testing_settings():
+def test_testing_settings(monkeypatch, clear_settings_cache):
     """Test testing environment settings."""
-    os.environ["ENVIRONMENT"] = "testing"
-    settings = Settings()
+    monkeypatch.setenv("ENVIRONMENT", "testing")
+    settings = get_settings()
     
     assert settings.debug is True
     assert settings.log_level == "DEBUG"
     assert "test" in settings.database_url.lower()
-    
-    os.environ.pop("ENVIRONMENT", None)
 
 def test_custom_settings():
     """Test custom settings configuration."""
@@ -134,9 +130,8 @@ def test_custom_settings():
 
 def test_settings_file():
     """Test settings file configuration."""
-    # Create test settings file
-    with open("test_settings.env", "w") as f:
-        f.write("""
+    # Parse test settings file content from memory
+    env_values = dotenv_values(stream=io.StringIO("""
         APP_NAME=File App
         DEBUG=true
         API_VERSION=4.0.0
@@ -144,10 +139,23 @@ def test_settings_file():
         SECRET_KEY=file_secret
         TOKEN_EXPIRE_MINUTES=90
         LOG_LEVEL=DEBUG
-        """)
-    
-    # Load settings from file
-    settings = Settings(_env_file="test_settings.env")
+        """))
+    
+    class StreamSettings(Settings):
+        @classmethod
+        def settings_customise_sources(
+            cls, settings_cls, init_settings, env_settings, dotenv_settings, file_secret_settings
+        ):
+            # Dotenv values rank below init kwargs and environment, as with _env_file
+            return (
+                init_settings,
+                env_settings,
+                InitSettingsSource(settings_cls, env_values),
+                file_secret_settings
+            )
+    
+    # Load settings from the parsed content
+    settings = StreamSettings()
     
     assert settings.app_name == "File App"
     assert settings.debug is True
@@ -156,9 +164,6 @@ def test_settings_file():
     assert settings.secret_key == "file_secret"
     assert settings.token_expire_minutes == 90
     assert settings.log_level == "DEBUG"
-    
-    # Clean up test file
-    os.remove("test_settings.env")
 
 def test_settings_export():
     """Test settings export functionality."""
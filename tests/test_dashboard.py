@@ -1,73 +1,67 @@
 """
 Tests for the Streamlit dashboard functionality.
 """
+import io
+import os
 import pytest
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from app.dashboard.main import (
-    load_data,
-    process_data,
-    create_overview_metrics,
-    create_sales_trends,
-    create_product_analysis,
-    create_customer_analysis,
-    create_geographic_analysis
-)
+from app.core.exceptions import DataProcessingError
+from app.dashboard import main as dashboard
+from app.dashboard.main import _read_data, create_customer_analysis, load_data
 
-@pytest.fixture
-def sample_data():
-    """Create sample data for testing."""
-    return pd.DataFrame({
-        'Invoice ID': ['INV001', 'INV002', 'INV003'],
-        'Branch': ['A', 'B', 'A'],
-        'City': ['City1', 'City2', 'City1'],
-        'Customer type': ['Member', 'Normal', 'Member'],
-        'Gender': ['Male', 'Female', 'Male'],
-        'Product line': ['Product1', 'Product2', 'Product1'],
-        'Unit price': [10.0, 15.0, 20.0],
-        'Quantity': [2, 1, 3],
-        'Total': [20.0, 15.0, 60.0],
-        'Date': [datetime(2023, 1, 1), datetime(2023, 1, 2), datetime(2023, 1, 3)],
-        'Time': ['10:00', '11:00', '12:00'],
-        'Payment': ['Cash', 'Credit card', 'Cash'],
-        'cogs': [10.0, 7.5, 30.0],
-        'gross margin percentage': [0.5, 0.5, 0.5],
-        'gross income': [10.0, 7.5, 30.0],
-        'Rating': [4.5, 4.0, 5.0]
-    })
+def test_load_data_csv(loaded_csv):
+    """Test loading data from CSV."""
+    assert isinstance(loaded_csv, pd.DataFrame)
+    assert not loaded_csv.empty
 
-def test_load_data():
-    """Test data loading functionality."""
-    # Test loading from CSV
-    data = load_data("tests/data/sample_sales.csv")
-    assert isinstance(data, pd.DataFrame)
-    assert not data.empty
-    
-    # Test loading from Excel
-    data = load_data("tests/data/sample_sales.xlsx")
-    assert isinstance(data, pd.DataFrame)
-    assert not data.empty
+def test_load_data_cache(tmp_path):
+    """Test parsed files are cached until they change on disk."""
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({'Total': [1.0, 2.0]}).to_csv(path, index=False)
+    
+    first = load_data(str(path))
+    first['Total'] = 0.0
+    hits = _read_data.cache_info().hits
+    second = load_data(str(path))
+    
+    # Cache hit, and callers get their own copy
+    assert _read_data.cache_info().hits == hits + 1
+    assert second['Total'].tolist() == [1.0, 2.0]
+    
+    # A newer file on disk is parsed again
+    pd.DataFrame({'Total': [3.0]}).to_csv(path, index=False)
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 1))
+    assert load_data(str(path))['Total'].tolist() == [3.0]
+
+@pytest.mark.slow
+def test_load_data_xlsx(loaded_xlsx):
+    """Test loading data from Excel."""
+    assert isinstance(loaded_xlsx, pd.DataFrame)
+    assert not loaded_xlsx.empty
 
 def test_process_data(sample_data):
     """Test data processing functionality."""
-    processed_data = process_data(sample_data)
+    processed_data = dashboard.process_data(sample_data)
     
     # Check data types
     assert processed_data['Date'].dtype == 'datetime64[ns]'
     assert processed_data['Time'].dtype == 'object'
     assert processed_data['Unit price'].dtype == 'float64'
     assert processed_data['Total'].dtype == 'float64'
+    for c in sample_data.select_dtypes('category'):
+        assert processed_data[c].dtype == 'category'
     
     # Check for missing values
     assert not processed_data.isnull().any().any()
     
     # Check for duplicates
-    assert not processed_data.duplicated().any()
+    assert pd.util.hash_pandas_object(processed_data, index=False).is_unique
 
+@pytest.mark.parametrize("sample_data", [3], indirect=True)
 def test_overview_metrics(sample_data):
     """Test overview metrics calculation."""
-    metrics = create_overview_metrics(sample_data)
+    metrics = dashboard.create_overview_metrics(sample_data)
     
     assert 'total_sales' in metrics
     assert 'total_transactions' in metrics
@@ -79,9 +73,10 @@ def test_overview_metrics(sample_data):
     assert metrics['average_transaction_value'] == pytest.approx(31.67, 0.01)
     assert metrics['total_customers'] == 2  # Unique customer types
 
+@pytest.mark.parametrize("sample_data", [3], indirect=True)
 def test_sales_trends(sample_data):
     """Test sales trends visualization."""
-    trends = create_sales_trends(sample_data)
+    trends = dashboard.create_sales_trends(sample_data)
     
     assert 'daily_sales' in trends
     assert 'monthly_sales' in trends
@@ -94,9 +89,10 @@ def test_sales_trends(sample_data):
     assert daily_sales.iloc[1]['Total'] == 15.0
     assert daily_sales.iloc[2]['Total'] == 60.0
 
+@pytest.mark.parametrize("sample_data", [3], indirect=True)
 def test_product_analysis(sample_data):
     """Test product analysis visualization."""
-    analysis = create_product_analysis(sample_data)
+    analysis = dashboard.create_product_analysis(sample_data)
     
     assert 'product_performance' in analysis
     assert 'category_breakdown' in analysis
@@ -107,6 +103,7 @@ def test_product_analysis(sample_data):
     assert product_perf['Product1']['total_sales'] == 80.0  # 20 + 60
     assert product_perf['Product2']['total_sales'] == 15.0
 
+@pytest.mark.parametrize("sample_data", [3], indirect=True)
 def test_customer_analysis(sample_data):
     """Test customer analysis visualization."""
     analysis = create_customer_analysis(sample_data)
@@ -116,13 +113,39 @@ def test_customer_analysis(sample_data):
     assert 'payment_method_breakdown' in analysis
     
     # Check customer type breakdown
-    customer_breakdown = analysis['customer_type_breakdown']
-    assert customer_breakdown['Member'] == 2
-    assert customer_breakdown['Normal'] == 1
+    expected = pd.Series(
+        [2, 1],
+        index=pd.CategoricalIndex(["Member", "Normal"], name="Customer type"),
+        name="count"
+    )
+    pd.testing.assert_series_equal(
+        analysis['customer_type_breakdown'].sort_index(),
+        expected.sort_index()
+    )
+
+def test_customer_analysis_categorical(sample_data):
+    """Test every breakdown is indexed by category, for object input too."""
+    data = sample_data.astype({c: object for c in sample_data.select_dtypes('category')})
+    analysis = create_customer_analysis(data)
+    
+    for column, key in [
+        ('Customer type', 'customer_type_breakdown'),
+        ('Gender', 'gender_breakdown'),
+        ('Payment', 'payment_method_breakdown'),
+    ]:
+        breakdown = analysis[key]
+        assert isinstance(breakdown.index, pd.CategoricalIndex)
+        assert breakdown.to_dict() == data[column].value_counts().to_dict()
+
+def test_customer_analysis_error():
+    """Test missing customer columns raise DataProcessingError."""
+    with pytest.raises(DataProcessingError, match="Error generating customer analysis"):
+        create_customer_analysis(pd.DataFrame({'Total': [1.0]}))
 
+@pytest.mark.parametrize("sample_data", [3], indirect=True)
 def test_geographic_analysis(sample_data):
     """Test geographic analysis visualization."""
-    analysis = create_geographic_analysis(sample_data)
+    analysis = dashboard.create_geographic_analysis(sample_data)
     
     assert 'branch_performance' in analysis
     assert 'city_performance' in analysis
@@ -134,25 +157,22 @@ def test_geographic_analysis(sample_data):
 
 def test_filter_interactions(sample_data):
     """Test filter interactions."""
-    # Test date range filter
-    filtered_data = sample_data[
-        (sample_data['Date'] >= datetime(2023, 1, 1)) &
-        (sample_data['Date'] <= datetime(2023, 1, 2))
-    ]
-    assert len(filtered_data) == 2
-    
-    # Test branch filter
-    filtered_data = sample_data[sample_data['Branch'] == 'A']
-    assert len(filtered_data) == 2
-    
-    # Test product filter
-    filtered_data = sample_data[sample_data['Product line'] == 'Product1']
-    assert len(filtered_data) == 2
+    # Date range, branch and product filters
+    masks = {
+        "date": sample_data['Date'].between('2023-01-01', '2023-01-02'),
+        "branch": sample_data['Branch'].eq('A'),
+        "product": sample_data['Product line'].eq('Product1'),
+    }
+    assert {name: mask.sum() for name, mask in masks.items()} == {
+        "date": 2,
+        "branch": 2,
+        "product": 2,
+    }
 
 def test_chart_interactions(sample_data):
     """Test chart interactions."""
     # Test bar chart
-    trends = create_sales_trends(sample_data)
+    trends = dashboard.create_sales_trends(sample_data)
     daily_sales = trends['daily_sales']
     assert isinstance(daily_sales, pd.DataFrame)
     assert 'Date' in daily_sales.columns
@@ -161,9 +181,10 @@ def test_chart_interactions(sample_data):
     # Test pie chart
     analysis = create_customer_analysis(sample_data)
     customer_breakdown = analysis['customer_type_breakdown']
-    assert isinstance(customer_breakdown, dict)
-    assert sum(customer_breakdown.values()) == len(sample_data)
+    assert isinstance(customer_breakdown, pd.Series)
+    assert customer_breakdown.sum() == len(sample_data)
 
+@pytest.mark.parametrize("sample_data", [3], indirect=True)
 def test_data_table_interactions(sample_data):
     """Test data table interactions."""
     # Test sorting
@@ -179,10 +200,13 @@ def test_data_table_interactions(sample_data):
 def test_export_functionality(sample_data):
     """Test export functionality."""
     # Test CSV export
-    csv_data = sample_data.to_csv(index=False)
-    assert isinstance(csv_data, str)
-    assert 'Invoice ID,Branch,City' in csv_data
+    buf = io.BytesIO()
+    sample_data.to_csv(buf, index=False)
+    buf.seek(0)
+    header = buf.read(64).decode()
+    assert 'Invoice ID,Branch,City' in header
     
     # Test Excel export
-    excel_data = sample_data.to_excel(index=False)
-    assert excel_data is None  # to_excel returns None when successful 
\ No newline at end of file
+    buf = io.BytesIO()
+    sample_data.to_excel(buf, index=False, engine="openpyxl")
+    assert buf.tell() > 0
@@ -3,10 +3,20 @@ Tests for the data processor service.
 """
 import pytest
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from app.services.data_processor import DataProcessor
 from app.models.database import Sale
 
+@pytest.fixture
+def db(savepoint_db):
+    """Run this module on a SAVEPOINT session, so seeded rows are rolled back after each test."""
+    return savepoint_db
+
+@pytest.fixture(params=[3, 1000])
+def sale_count(request):
+    """Number of sales to generate for metrics tests."""
+    return request.param
+
 def test_validate_dataframe():
     """Test DataFrame validation."""
     # Create test data
@@ -76,7 +86,19 @@ def test_clean_dataframe():
     
     # Test cleaning
     cleaned_df = DataProcessor.clean_dataframe(df)
-    assert len(cleaned_df) == 3  # Duplicates removed
+    
+    # Duplicates removed, remaining rows kept in order
+    expected = pd.DataFrame({
+        'invoice_id': ['INV001', 'INV002', 'INV003'],
+        'unit_price': [10.0, 20.0, 30.0],
+        'quantity': [2, 3, 1],
+        'date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-03'])
+    })
+    pd.testing.assert_frame_equal(
+        cleaned_df[expected.columns].reset_index(drop=True),
+        expected,
+        check_dtype=False
+    )
     assert all(col.islower() for col in cleaned_df.columns)  # Column names lowercase
     assert 'total' in cleaned_df.columns  # Total calculated
     assert 'cogs' in cleaned_df.columns  # COGS calculated
@@ -111,67 +133,23 @@ def test_process_sales_data(db):
     assert len(sales) == 3
     assert all(s.invoice_id in ['INV001', 'INV002', 'INV003'] for s in sales)
 
-def test_get_sales_metrics(db):
+def test_get_sales_metrics(db, seed_sales, sale_count):
     """Test getting sales metrics."""
     # Create test sales data
-    sales = [
-        Sale(
-            invoice_id=f"INV{i:03d}",
-            branch="A",
-            city="City1",
-            customer_type="Member",
-            gender="Male",
-            product_line="Product1",
-            unit_price=10.0,
-            quantity=2,
-            total=20.0,
-            date=datetime(2023, 1, 1) + timedelta(days=i),
-            time="10:00",
-            payment="Cash",
-            cogs=10.0,
-            gross_margin_percentage=0.5,
-            gross_income=10.0,
-            rating=4.5
-        )
-        for i in range(1, 4)
-    ]
-    db.add_all(sales)
-    db.commit()
+    seed_sales(sale_count)
     
     # Test getting metrics
     metrics = DataProcessor.get_sales_metrics(db)
-    assert metrics["total_sales"] == 60.0
-    assert metrics["total_transactions"] == 3
+    assert metrics["total_sales"] == 20.0 * sale_count
+    assert metrics["total_transactions"] == sale_count
     assert metrics["average_order_value"] == 20.0
-    assert metrics["total_products_sold"] == 6
+    assert metrics["total_products_sold"] == 2 * sale_count
     assert metrics["average_rating"] == 4.5
 
-def test_get_sales_metrics_with_date_range(db):
+def test_get_sales_metrics_with_date_range(db, seed_sales):
     """Test getting sales metrics with date range."""
     # Create test sales data
-    sales = [
-        Sale(
-            invoice_id=f"INV{i:03d}",
-            branch="A",
-            city="City1",
-            customer_type="Member",
-            gender="Male",
-            product_line="Product1",
-            unit_price=10.0,
-            quantity=2,
-            total=20.0,
-            date=datetime(2023, 1, 1) + timedelta(days=i),
-            time="10:00",
-            payment="Cash",
-            cogs=10.0,
-            gross_margin_percentage=0.5,
-            gross_income=10.0,
-            rating=4.5
-        )
-        for i in range(1, 4)
-    ]
-    db.add_all(sales)
-    db.commit()
+    seed_sales(3)
     
     # Test getting metrics with date range
     start_date = datetime(2023, 1, 2)
@@ -3,7 +3,8 @@ Integration tests for the application.
 """
 import pytest
 import pandas as pd
-from datetime import datetime, timedelta
+from sqlalchemy import func
+from openpyxl import load_workbook
 from app.services.data_processing import DataProcessor
 from app.services.analytics import Analytics
 from app.services.dashboard import Dashboard
@@ -12,28 +13,15 @@ from app.models.database import Sale, User
 from app.services.auth import create_user, authenticate_user
 from app.models.schemas import UserCreate
 
-def test_data_processing_to_analytics(db):
+@pytest.fixture
+def db(savepoint_db):
+    """Run each test on the shared in-memory database, rolled back afterwards."""
+    return savepoint_db
+
+def test_data_processing_to_analytics(db, pipeline_data):
     """Test integration between data processing and analytics services."""
-    # Create test data
-    data = {
-        'Invoice ID': ['INV001', 'INV002'],
-        'Branch': ['A', 'B'],
-        'City': ['City1', 'City2'],
-        'Customer type': ['Member', 'Normal'],
-        'Gender': ['Male', 'Female'],
-        'Product line': ['Product1', 'Product2'],
-        'Unit price': [10.0, 20.0],
-        'Quantity': [2, 3],
-        'Total': [20.0, 60.0],
-        'Date': ['2023-01-01', '2023-01-02'],
-        'Time': ['10:00', '11:00'],
-        'Payment': ['Cash', 'Credit card'],
-        'cogs': [10.0, 30.0],
-        'gross margin percentage': [0.5, 0.5],
-        'gross income': [10.0, 30.0],
-        'Rating': [4.5, 4.0]
-    }
-    df = pd.DataFrame(data)
+    # Shared two-sale test data
+    df = pipeline_data
     
     # Process data
     processor = DataProcessor()
@@ -51,32 +39,10 @@ def test_data_processing_to_analytics(db):
     assert "total_sales" in summary
     assert summary["total_sales"] == 80.0
 
-def test_analytics_to_dashboard(db):
+def test_analytics_to_dashboard(db, seed_sales):
     """Test integration between analytics and dashboard services."""
     # Create test sales data
-    sales = [
-        Sale(
-            invoice_id=f"INV{i:03d}",
-            branch="A",
-            city="City1",
-            customer_type="Member",
-            gender="Male",
-            product_line="Product1",
-            unit_price=10.0,
-            quantity=2,
-            total=20.0,
-            date=datetime(2023, 1, 1) + timedelta(days=i),
-            time="10:00",
-            payment="Cash",
-            cogs=10.0,
-            gross_margin_percentage=0.5,
-            gross_income=10.0,
-            rating=4.5
-        )
-        for i in range(1, 4)
-    ]
-    db.add_all(sales)
-    db.commit()
+    seed_sales(3)
     
     # Run analytics
     analytics = Analytics()
@@ -93,32 +59,10 @@ def test_analytics_to_dashboard(db):
     assert result["overview"]["total_sales"] == summary["total_sales"]
     assert len(result["trends"]["daily_sales"]) == len(time_series)
 
-def test_dashboard_to_export(db, tmp_path):
+def test_dashboard_to_export(db, seed_sales, tmp_path):
     """Test integration between dashboard and export services."""
     # Create test sales data
-    sales = [
-        Sale(
-            invoice_id=f"INV{i:03d}",
-            branch="A",
-            city="City1",
-            customer_type="Member",
-            gender="Male",
-            product_line="Product1",
-            unit_price=10.0,
-            quantity=2,
-            total=20.0,
-            date=datetime(2023, 1, 1) + timedelta(days=i),
-            time="10:00",
-            payment="Cash",
-            cogs=10.0,
-            gross_margin_percentage=0.5,
-            gross_income=10.0,
-            rating=4.5
-        )
-        for i in range(1, 4)
-    ]
-    db.add_all(sales)
-    db.commit()
+    seed_sales(3)
     
     # Create dashboard
     dashboard = Dashboard()
@@ -133,12 +77,12 @@ def test_dashboard_to_export(db, tmp_path):
     assert result == str(file_path)
     assert file_path.exists()
     
-    # Verify exported data matches dashboard
-    df = pd.read_excel(file_path)
-    assert len(df) == 3
-    assert df["total"].sum() == dashboard_data["overview"]["total_sales"]
+    # Verify dashboard totals against the database directly
+    count, total = db.query(func.count(Sale.id), func.sum(Sale.total)).one()
+    assert count == 3
+    assert total == dashboard_data["overview"]["total_sales"]
 
-def test_auth_to_data_processing(db):
+def test_auth_to_data_processing(db, pipeline_data):
     """Test integration between authentication and data processing services."""
     # Create test user
     user = UserCreate(
@@ -153,26 +97,8 @@ def test_auth_to_data_processing(db):
     # Authenticate user
     authenticated_user = authenticate_user(db, "testuser", "testpass123")
     
-    # Create test data
-    data = {
-        'Invoice ID': ['INV001', 'INV002'],
-        'Branch': ['A', 'B'],
-        'City': ['City1', 'City2'],
-        'Customer type': ['Member', 'Normal'],
-        'Gender': ['Male', 'Female'],
-        'Product line': ['Product1', 'Product2'],
-        'Unit price': [10.0, 20.0],
-        'Quantity': [2, 3],
-        'Total': [20.0, 60.0],
-        'Date': ['2023-01-01', '2023-01-02'],
-        'Time': ['10:00', '11:00'],
-        'Payment': ['Cash', 'Credit card'],
-        'cogs': [10.0, 30.0],
-        'gross margin percentage': [0.5, 0.5],
-        'gross income': [10.0, 30.0],
-        'Rating': [4.5, 4.0]
-    }
-    df = pd.DataFrame(data)
+    # Shared two-sale test data
+    df = pipeline_data
     
     # Process data
     processor = DataProcessor()
@@ -183,7 +109,7 @@ def test_auth_to_data_processing(db):
     assert authenticated_user.username == "testuser"
     assert result == 2  # Two records processed
 
-def test_full_pipeline(db, tmp_path):
+def test_full_pipeline(db, pipeline_data, tmp_path):
     """Test complete application pipeline."""
     # Create test user
     user = UserCreate(
@@ -195,26 +121,8 @@ def test_full_pipeline(db, tmp_path):
     )
     db_user = create_user(db, user)
     
-    # Create test data
-    data = {
-        'Invoice ID': ['INV001', 'INV002'],
-        'Branch': ['A', 'B'],
-        'City': ['City1', 'City2'],
-        'Customer type': ['Member', 'Normal'],
-        'Gender': ['Male', 'Female'],
-        'Product line': ['Product1', 'Product2'],
-        'Unit price': [10.0, 20.0],
-        'Quantity': [2, 3],
-        'Total': [20.0, 60.0],
-        'Date': ['2023-01-01', '2023-01-02'],
-        'Time': ['10:00', '11:00'],
-        'Payment': ['Cash', 'Credit card'],
-        'cogs': [10.0, 30.0],
-        'gross margin percentage': [0.5, 0.5],
-        'gross income': [10.0, 30.0],
-        'Rating': [4.5, 4.0]
-    }
-    df = pd.DataFrame(data)
+    # Shared two-sale test data
+    df = pipeline_data
     
     # Process data
     processor = DataProcessor()
@@ -240,7 +148,10 @@ def test_full_pipeline(db, tmp_path):
     assert file_path.exists()
     
     # Verify data consistency
-    df = pd.read_excel(file_path)
-    assert len(df) == 2
-    assert df["total"].sum() == dashboard_data["overview"]["total_sales"]
-    assert df["total"].sum() == summary["total_sales"] 
\ No newline at end of file
+    wb = load_workbook(file_path, read_only=True)
+    header, *rows = wb.active.values
+    wb.close()
+    exported_total = sum(r[header.index("total")] for r in rows)
+    assert len(rows) == 2
+    assert exported_total == dashboard_data["overview"]["total_sales"]
+    assert exported_total == summary["total_sales"] 
\ No newline at end of file
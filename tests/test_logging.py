@@ -5,6 +5,7 @@ import pytest
 import logging
 import os
 from datetime import datetime
+from logging.handlers import RotatingFileHandler
 from app.core.logging import setup_logging, get_logger
 from app.services.data_processing import DataProcessor
 from app.services.analytics import Analytics
@@ -12,6 +13,21 @@ from app.services.dashboard import Dashboard
 from app.services.export import ExportService
 import pandas as pd
 
+def _read_from(path, start):
+    """Read a file from the given byte offset to EOF."""
+    with open(path) as f:
+        f.seek(start)
+        return f.read()
+
+@pytest.fixture
+def log_tail():
+    """Return a callable reading only what the log file gained during the test."""
+    path = next(
+        h for h in logging.getLogger().handlers if isinstance(h, RotatingFileHandler)
+    ).baseFilename
+    start = os.path.getsize(path) if os.path.exists(path) else 0
+    yield lambda: _read_from(path, start)
+
 def test_logging_setup():
     """Test logging setup and configuration."""
     # Setup logging
@@ -28,38 +44,30 @@ def test_logging_setup():
     log_file = f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log"
     assert os.path.exists(log_file)
 
-def test_logging_levels():
+def test_logging_levels(caplog):
     """Test different logging levels."""
     logger = get_logger(__name__)
     
     # Test debug logging
     logger.debug("Debug message")
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "DEBUG" not in log_content  # Debug messages should not be logged
+    assert "DEBUG" not in caplog.text  # Debug messages should not be logged
     
     # Test info logging
     logger.info("Info message")
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "INFO" in log_content
-        assert "Info message" in log_content
+    assert "INFO" in caplog.text
+    assert "Info message" in caplog.text
     
     # Test warning logging
     logger.warning("Warning message")
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "WARNING" in log_content
-        assert "Warning message" in log_content
+    assert "WARNING" in caplog.text
+    assert "Warning message" in caplog.text
     
     # Test error logging
     logger.error("Error message")
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "ERROR" in log_content
-        assert "Error message" in log_content
+    assert "ERROR" in caplog.text
+    assert "Error message" in caplog.text
 
-def test_data_processing_logging():
+def test_data_processing_logging(caplog):
     """Test logging in data processing service."""
     logger = get_logger("data_processing")
     processor = DataProcessor()
@@ -68,22 +76,18 @@ def test_data_processing_logging():
     df = pd.DataFrame({"test": [1, 2, 3]})
     processor.process_data(df)
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "INFO" in log_content
-        assert "Data processing started" in log_content
-        assert "Data processing completed" in log_content
+    assert "INFO" in caplog.text
+    assert "Data processing started" in caplog.text
+    assert "Data processing completed" in caplog.text
     
     # Test error logging
     with pytest.raises(ValueError):
         processor.process_data(pd.DataFrame())
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "ERROR" in log_content
-        assert "Data processing failed" in log_content
+    assert "ERROR" in caplog.text
+    assert "Data processing failed" in caplog.text
 
-def test_analytics_logging():
+def test_analytics_logging(caplog):
     """Test logging in analytics service."""
     logger = get_logger("analytics")
     analytics = Analytics()
@@ -91,22 +95,18 @@ def test_analytics_logging():
     # Test successful analytics logging
     analytics.get_time_series_data()
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "INFO" in log_content
-        assert "Analytics processing started" in log_content
-        assert "Analytics processing completed" in log_content
+    assert "INFO" in caplog.text
+    assert "Analytics processing started" in caplog.text
+    assert "Analytics processing completed" in caplog.text
     
     # Test error logging
     with pytest.raises(ValueError):
         analytics.get_time_series_data(pd.DataFrame())
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "ERROR" in log_content
-        assert "Analytics processing failed" in log_content
+    assert "ERROR" in caplog.text
+    assert "Analytics processing failed" in caplog.text
 
-def test_dashboard_logging():
+def test_dashboard_logging(caplog):
     """Test logging in dashboard service."""
     logger = get_logger("dashboard")
     dashboard = Dashboard()
@@ -114,22 +114,18 @@ def test_dashboard_logging():
     # Test successful dashboard creation logging
     dashboard.create_dashboard()
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "INFO" in log_content
-        assert "Dashboard creation started" in log_content
-        assert "Dashboard creation completed" in log_content
+    assert "INFO" in caplog.text
+    assert "Dashboard creation started" in caplog.text
+    assert "Dashboard creation completed" in caplog.text
     
     # Test error logging
     with pytest.raises(ValueError):
         dashboard.create_dashboard(pd.DataFrame())
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "ERROR" in log_content
-        assert "Dashboard creation failed" in log_content
+    assert "ERROR" in caplog.text
+    assert "Dashboard creation failed" in caplog.text
 
-def test_export_logging():
+def test_export_logging(caplog):
     """Test logging in export service."""
     logger = get_logger("export")
     export_service = ExportService()
@@ -138,22 +134,18 @@ def test_export_logging():
     df = pd.DataFrame({"test": [1, 2, 3]})
     export_service.export_to_csv(df, "test.csv")
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "INFO" in log_content
-        assert "Export started" in log_content
-        assert "Export completed" in log_content
+    assert "INFO" in caplog.text
+    assert "Export started" in caplog.text
+    assert "Export completed" in caplog.text
     
     # Test error logging
     with pytest.raises(ValueError):
         export_service.export_to_csv(pd.DataFrame(), "test.csv")
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "ERROR" in log_content
-        assert "Export failed" in log_content
+    assert "ERROR" in caplog.text
+    assert "Export failed" in caplog.text
 
-def test_log_rotation():
+def test_log_rotation(log_tail):
     """Test log rotation functionality."""
     # Setup logging
     setup_logging()
@@ -163,6 +155,10 @@ def test_log_rotation():
     for i in range(5):
         logger.info(f"Test log message {i}")
     
+    # Check the new messages reached the file, reading only the appended bytes
+    new_logs = log_tail()
+    assert all(f"Test log message {i}" in new_logs for i in range(5))
+    
     # Check log files
     log_files = [f for f in os.listdir("logs") if f.startswith("app_")]
     assert len(log_files) > 0
@@ -172,17 +168,20 @@ def test_log_rotation():
         file_size = os.path.getsize(os.path.join("logs", log_file))
         assert file_size > 0
 
-def test_log_format():
+def test_log_format(caplog):
     """Test log message format."""
     logger = get_logger(__name__)
     logger.info("Test message")
     
-    with open(f"logs/app_{datetime.now().strftime('%Y-%m-%d')}.log", "r") as f:
-        log_content = f.read()
-        assert "[" in log_content  # Timestamp
-        assert "]" in log_content  # Log level
-        assert "test_logging" in log_content  # Module name
-        assert "Test message" in log_content  # Message
+    # Render the captured records with the application's file formatter
+    file_handler = next(
+        h for h in logging.getLogger().handlers if isinstance(h, RotatingFileHandler)
+    )
+    log_content = "\n".join(file_handler.format(record) for record in caplog.records)
+    assert "[" in log_content  # Timestamp
+    assert "]" in log_content  # Log level
+    assert "test_logging" in log_content  # Module name
+    assert "Test message" in log_content  # Message
 
 def test_log_cleanup():
     """Test log cleanup functionality."""
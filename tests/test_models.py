@@ -3,22 +3,62 @@ Tests for the database models.
 """
 import pytest
 from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from app.models.database import User, Sale
 from app.models.schemas import UserCreate, SaleCreate
 
-def test_user_model(db):
+# Field values shared by every User and Sale built in this module
+USER_DEFAULTS = {
+    "username": "testuser",
+    "email": "test@example.com",
+    "password": "hashed_password",
+    "is_superuser": False,
+    "is_active": True
+}
+SALE_DEFAULTS = {
+    "invoice_id": "INV001",
+    "branch": "A",
+    "city": "City1",
+    "customer_type": "Member",
+    "gender": "Male",
+    "product_line": "Product1",
+    "unit_price": 10.0,
+    "quantity": 2,
+    "total": 20.0,
+    "date": datetime(2023, 1, 1),
+    "time": "10:00",
+    "payment": "Cash",
+    "cogs": 10.0,
+    "gross_margin_percentage": 0.5,
+    "gross_income": 10.0,
+    "rating": 4.5
+}
+
+@pytest.fixture
+def user_factory(db):
+    """Return a callable adding a User built from the defaults plus overrides."""
+    def make(**overrides):
+        user = User(**{**USER_DEFAULTS, **overrides})
+        db.add(user)
+        return user
+    return make
+
+@pytest.fixture
+def sale_factory(db):
+    """Return a callable adding a Sale built from the defaults plus overrides."""
+    def make(**overrides):
+        sale = Sale(**{**SALE_DEFAULTS, **overrides})
+        db.add(sale)
+        return sale
+    return make
+
+def test_user_model(db, user_factory):
     """Test User model."""
     # Create user
-    user = User(
-        username="testuser",
-        email="test@example.com",
-        password="hashed_password",
-        is_superuser=False,
-        is_active=True
-    )
-    db.add(user)
+    user = user_factory()
     db.commit()
-    db.refresh(user)
     
     # Test user attributes
     assert user.id is not None
@@ -32,45 +72,12 @@ def test_user_model(db):
     
     # Test user string representation
     assert str(user) == f"User(id={user.id}, username='testuser')"
-    
-    # Test user from schema
-    user_schema = UserCreate(
-        username="newuser",
-        email="new@example.com",
-        password="newpass123",
-        is_superuser=False,
-        is_active=True
-    )
-    new_user = User(**user_schema.dict(exclude={'password'}))
-    assert new_user.username == "newuser"
-    assert new_user.email == "new@example.com"
-    assert new_user.is_superuser == False
-    assert new_user.is_active == True
 
-def test_sale_model(db):
+def test_sale_model(db, sale_factory):
     """Test Sale model."""
     # Create sale
-    sale = Sale(
-        invoice_id="INV001",
-        branch="A",
-        city="City1",
-        customer_type="Member",
-        gender="Male",
-        product_line="Product1",
-        unit_price=10.0,
-        quantity=2,
-        total=20.0,
-        date=datetime(2023, 1, 1),
-        time="10:00",
-        payment="Cash",
-        cogs=10.0,
-        gross_margin_percentage=0.5,
-        gross_income=10.0,
-        rating=4.5
-    )
-    db.add(sale)
+    sale = sale_factory()
     db.commit()
-    db.refresh(sale)
     
     # Test sale attributes
     assert sale.id is not None
@@ -95,8 +102,28 @@ def test_sale_model(db):
     
     # Test sale string representation
     assert str(sale) == f"Sale(id={sale.id}, invoice_id='INV001')"
+
+def test_models_from_schemas():
+    """Test building User and Sale models from validated schemas.
     
-    # Test sale from schema
+    The other tests build models straight from the factories; this is the
+    one test that goes through pydantic validation.
+    """
+    # User from schema
+    user_schema = UserCreate(
+        username="newuser",
+        email="new@example.com",
+        password="newpass123",
+        is_superuser=False,
+        is_active=True
+    )
+    new_user = User(**user_schema.model_dump(exclude={'password'}))
+    assert new_user.username == "newuser"
+    assert new_user.email == "new@example.com"
+    assert new_user.is_superuser == False
+    assert new_user.is_active == True
+    
+    # Sale from schema
     sale_schema = SaleCreate(
         invoice_id="INV002",
         branch="B",
@@ -115,7 +142,7 @@ def test_sale_model(db):
         gross_income=30.0,
         rating=4.0
     )
-    new_sale = Sale(**sale_schema.dict())
+    new_sale = Sale(**sale_schema.model_dump())
     assert new_sale.invoice_id == "INV002"
     assert new_sale.branch == "B"
     assert new_sale.city == "City2"
@@ -133,171 +160,56 @@ def test_sale_model(db):
     assert new_sale.gross_income == 30.0
     assert new_sale.rating == 4.0
 
-def test_user_unique_constraints(db):
-    """Test User model unique constraints."""
-    # Create first user
-    user1 = User(
-        username="testuser",
-        email="test@example.com",
-        password="hashed_password",
-        is_superuser=False,
-        is_active=True
-    )
-    db.add(user1)
-    db.commit()
-    
-    # Try to create user with same username
-    user2 = User(
-        username="testuser",  # Same username
-        email="test2@example.com",
-        password="hashed_password",
-        is_superuser=False,
-        is_active=True
-    )
-    db.add(user2)
-    with pytest.raises(Exception):
-        db.commit()
-    db.rollback()
+@pytest.mark.parametrize("factory, duplicate", [
+    ("user_factory", {"email": "test2@example.com"}),  # Same username
+    ("user_factory", {"username": "testuser2"}),  # Same email
+    ("sale_factory", {"branch": "B", "total": 60.0})  # Same invoice ID
+], ids=["user-username", "user-email", "sale-invoice-id"])
+def test_unique_constraints(db, request, factory, duplicate):
+    """Test User and Sale model unique constraints."""
+    make = request.getfixturevalue(factory)
     
-    # Try to create user with same email
-    user3 = User(
-        username="testuser2",
-        email="test@example.com",  # Same email
-        password="hashed_password",
-        is_superuser=False,
-        is_active=True
-    )
-    db.add(user3)
-    with pytest.raises(Exception):
-        db.commit()
-    db.rollback()
-
-def test_sale_unique_constraints(db):
-    """Test Sale model unique constraints."""
-    # Create first sale
-    sale1 = Sale(
-        invoice_id="INV001",
-        branch="A",
-        city="City1",
-        customer_type="Member",
-        gender="Male",
-        product_line="Product1",
-        unit_price=10.0,
-        quantity=2,
-        total=20.0,
-        date=datetime(2023, 1, 1),
-        time="10:00",
-        payment="Cash",
-        cogs=10.0,
-        gross_margin_percentage=0.5,
-        gross_income=10.0,
-        rating=4.5
-    )
-    db.add(sale1)
+    # Create the first record
+    make()
     db.commit()
     
-    # Try to create sale with same invoice ID
-    sale2 = Sale(
-        invoice_id="INV001",  # Same invoice ID
-        branch="B",
-        city="City2",
-        customer_type="Normal",
-        gender="Female",
-        product_line="Product2",
-        unit_price=20.0,
-        quantity=3,
-        total=60.0,
-        date=datetime(2023, 1, 2),
-        time="11:00",
-        payment="Credit card",
-        cogs=30.0,
-        gross_margin_percentage=0.5,
-        gross_income=30.0,
-        rating=4.0
-    )
-    db.add(sale2)
-    with pytest.raises(Exception):
+    # Try to create a record sharing the unique field
+    make(**duplicate)
+    with pytest.raises(IntegrityError):
         db.commit()
     db.rollback()
 
-def test_user_relationships(db):
+def test_user_relationships(db, user_factory):
     """Test User model relationships."""
     # Create user
-    user = User(
-        username="testuser",
-        email="test@example.com",
-        password="hashed_password",
-        is_superuser=False,
-        is_active=True
-    )
-    db.add(user)
+    user = user_factory()
     db.commit()
     
     # Create sales for user
-    sales = [
-        Sale(
-            invoice_id=f"INV{i:03d}",
-            branch="A",
-            city="City1",
-            customer_type="Member",
-            gender="Male",
-            product_line="Product1",
-            unit_price=10.0,
-            quantity=2,
-            total=20.0,
-            date=datetime(2023, 1, 1),
-            time="10:00",
-            payment="Cash",
-            cogs=10.0,
-            gross_margin_percentage=0.5,
-            gross_income=10.0,
-            rating=4.5,
-            user_id=user.id
-        )
+    db.add_all([
+        Sale(**{**SALE_DEFAULTS, "invoice_id": f"INV{i:03d}", "user_id": user.id})
         for i in range(1, 4)
-    ]
-    db.add_all(sales)
+    ])
     db.commit()
     
+    # Load the user's sales in one extra query; sale.user then resolves from the identity map
+    user = db.execute(
+        select(User).options(selectinload(User.sales)).where(User.id == user.id)
+    ).scalar_one()
+    
     # Test user-sales relationship
     assert len(user.sales) == 3
     assert all(sale.user_id == user.id for sale in user.sales)
     assert all(sale.user == user for sale in user.sales)
 
-def test_sale_relationships(db):
+def test_sale_relationships(db, user_factory, sale_factory):
     """Test Sale model relationships."""
     # Create user
-    user = User(
-        username="testuser",
-        email="test@example.com",
-        password="hashed_password",
-        is_superuser=False,
-        is_active=True
-    )
-    db.add(user)
+    user = user_factory()
     db.commit()
     
     # Create sale
-    sale = Sale(
-        invoice_id="INV001",
-        branch="A",
-        city="City1",
-        customer_type="Member",
-        gender="Male",
-        product_line="Product1",
-        unit_price=10.0,
-        quantity=2,
-        total=20.0,
-        date=datetime(2023, 1, 1),
-        time="10:00",
-        payment="Cash",
-        cogs=10.0,
-        gross_margin_percentage=0.5,
-        gross_income=10.0,
-        rating=4.5,
-        user_id=user.id
-    )
-    db.add(sale)
+    sale = sale_factory(user_id=user.id)
     db.commit()
     
     # Test sale-user relationship
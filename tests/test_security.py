@@ -8,9 +8,13 @@ from app.services.auth import AuthService
 from app.models.database import User
 from app.config.settings import settings
 
-def test_password_hashing():
+@pytest.fixture(scope="module")
+def auth_service():
+    """Share one AuthService across the module; hashing cost is kept low in conftest."""
+    return AuthService()
+
+def test_password_hashing(auth_service):
     """Test password hashing and verification."""
-    auth_service = AuthService()
     password = "test_password123"
     
     # Test password hashing
@@ -22,9 +26,8 @@ def test_password_hashing():
     assert auth_service.verify_password(password, hashed_password)
     assert not auth_service.verify_password("wrong_password", hashed_password)
 
-def test_token_creation_and_validation():
+def test_token_creation_and_validation(auth_service):
     """Test JWT token creation and validation."""
-    auth_service = AuthService()
     user_data = {
         "sub": "testuser",
         "exp": datetime.utcnow() + timedelta(minutes=15)
@@ -40,9 +43,8 @@ def test_token_creation_and_validation():
     assert payload["sub"] == "testuser"
     assert "exp" in payload
 
-def test_token_expiration():
+def test_token_expiration(auth_service):
     """Test JWT token expiration."""
-    auth_service = AuthService()
     user_data = {
         "sub": "testuser",
         "exp": datetime.utcnow() - timedelta(minutes=1)  # Expired token
@@ -55,10 +57,8 @@ def test_token_expiration():
     with pytest.raises(jwt.ExpiredSignatureError):
         auth_service.decode_token(token)
 
-def test_invalid_token():
+def test_invalid_token(auth_service):
     """Test handling of invalid tokens."""
-    auth_service = AuthService()
-    
     # Test invalid token format
     with pytest.raises(jwt.InvalidTokenError):
         auth_service.decode_token("invalid_token")
@@ -74,10 +74,8 @@ def test_invalid_token():
     with pytest.raises(jwt.InvalidSignatureError):
         auth_service.decode_token(tampered_token)
 
-def test_user_authentication(db):
+def test_user_authentication(auth_service, db):
     """Test user authentication process."""
-    auth_service = AuthService()
-    
     # Create test user
     user = User(
         username="testuser",
@@ -96,10 +94,8 @@ def test_user_authentication(db):
     assert auth_service.authenticate_user(db, "testuser", "wrong_password") is None
     assert auth_service.authenticate_user(db, "nonexistent_user", "test_password123") is None
 
-def test_password_policy():
+def test_password_policy(auth_service):
     """Test password policy enforcement."""
-    auth_service = AuthService()
-    
     # Test password length
     assert not auth_service.validate_password("short")  # Too short
     assert not auth_service.validate_password("a" * 51)  # Too long
@@ -112,10 +108,8 @@ def test_password_policy():
     assert not auth_service.validate_password("PASSWORD123!")  # No lowercase
     assert auth_service.validate_password("ValidPass123!")  # Meets all requirements
 
-def test_rate_limiting():
+def test_rate_limiting(auth_service):
     """Test rate limiting for authentication attempts."""
-    auth_service = AuthService()
-    
     # Simulate multiple failed login attempts
     for _ in range(5):
         auth_service.record_failed_attempt("testuser")
@@ -127,10 +121,8 @@ def test_rate_limiting():
     auth_service.failed_attempts["testuser"]["timestamp"] = datetime.utcnow() - timedelta(minutes=16)
     assert not auth_service.is_account_locked("testuser")
 
-def test_session_management():
+def test_session_management(auth_service):
     """Test session management."""
-    auth_service = AuthService()
-    
     # Create session
     session_id = auth_service.create_session("testuser")
     assert session_id is not None
@@ -142,10 +134,8 @@ def test_session_management():
     auth_service.invalidate_session(session_id)
     assert not auth_service.verify_session(session_id)
 
-def test_sql_injection_prevention(db):
+def test_sql_injection_prevention(auth_service, db):
     """Test SQL injection prevention."""
-    auth_service = AuthService()
-    
     # Attempt SQL injection in username
     malicious_username = "testuser' OR '1'='1"
     assert auth_service.authenticate_user(db, malicious_username, "password") is None
@@ -154,10 +144,8 @@ def test_sql_injection_prevention(db):
     malicious_password = "password' OR '1'='1"
     assert auth_service.authenticate_user(db, "testuser", malicious_password) is None
 
-def test_xss_prevention():
+def test_xss_prevention(auth_service):
     """Test XSS prevention."""
-    auth_service = AuthService()
-    
     # Test XSS in username
     xss_username = "<script>alert('xss')</script>"
     assert auth_service.sanitize_input(xss_username) != xss_username
@@ -166,10 +154,8 @@ def test_xss_prevention():
     xss_email = "test<script>alert('xss')</script>@example.com"
     assert auth_service.sanitize_input(xss_email) != xss_email
 
-def test_csrf_protection():
+def test_csrf_protection(auth_service):
     """Test CSRF protection."""
-    auth_service = AuthService()
-    
     # Generate CSRF token
     csrf_token = auth_service.generate_csrf_token()
     assert csrf_token is not None
@@ -1,41 +1,104 @@
 """
 UI tests for the Streamlit dashboard.
 """
+import json
 import pytest
-import streamlit as st
+import numpy as np
 from app.services.dashboard import Dashboard
-from app.services.analytics import Analytics
-from app.services.data_processing import DataProcessor
 import pandas as pd
-from datetime import datetime, timedelta
-
-def generate_test_data():
-    """Generate test data for UI testing."""
-    data = {
-        'Invoice ID': ['INV001', 'INV002', 'INV003'],
-        'Branch': ['A', 'B', 'C'],
-        'City': ['City1', 'City2', 'City3'],
-        'Customer type': ['Member', 'Normal', 'Member'],
-        'Gender': ['Male', 'Female', 'Male'],
-        'Product line': ['Product1', 'Product2', 'Product3'],
-        'Unit price': [10.0, 20.0, 30.0],
-        'Quantity': [1, 2, 3],
-        'Total': [10.0, 40.0, 90.0],
-        'Date': ['2023-01-01', '2023-01-02', '2023-01-03'],
-        'Time': ['10:00', '11:00', '12:00'],
-        'Payment': ['Cash', 'Credit card', 'E-wallet'],
-        'cogs': [5.0, 20.0, 45.0],
-        'gross margin percentage': [0.5, 0.5, 0.5],
-        'gross income': [5.0, 20.0, 45.0],
-        'Rating': [4.5, 4.0, 4.8]
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+# Snapshot of the keys each dashboard section returns
+SECTION_SNAPSHOT = Path(__file__).parent / "data" / "dashboard_sections.json"
+
+# Section tests only read the shared fixtures, so they can run on any worker
+pytestmark = pytest.mark.parallel
+
+# Sample rows shared by every test in the module, as typed arrays built once at import;
+# low-cardinality columns are categorical and Quantity is 32-bit
+_SAMPLE_DICT = {
+    'Invoice ID': np.array(['INV001', 'INV002', 'INV003'], dtype=object),
+    'Branch': pd.Categorical(['A', 'B', 'C']),
+    'City': pd.Categorical(['City1', 'City2', 'City3']),
+    'Customer type': pd.Categorical(['Member', 'Normal', 'Member']),
+    'Gender': pd.Categorical(['Male', 'Female', 'Male']),
+    'Product line': pd.Categorical(['Product1', 'Product2', 'Product3']),
+    'Quantity': np.array([1, 2, 3], dtype=np.int32),
+    'Date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-03']),
+    'Time': np.array(['10:00', '11:00', '12:00'], dtype=object),
+    'Payment': pd.Categorical(['Cash', 'Credit card', 'E-wallet'])
+}
+
+# Float columns of the sample rows, held as one column-major float32 block so
+# pandas keeps them in a single contiguous block
+_FLOAT_COLUMNS = ['Unit price', 'Total', 'cogs', 'gross margin percentage', 'gross income', 'Rating']
+_FLOAT_BLOCK = np.array([
+    [10.0, 10.0, 5.0, 0.5, 5.0, 4.5],
+    [20.0, 40.0, 20.0, 0.5, 20.0, 4.0],
+    [30.0, 90.0, 45.0, 0.5, 45.0, 4.8]
+], dtype=np.float32, order='F')
+
+# Expected overview figures, derived from the sample rows
+_TOTALS = _FLOAT_BLOCK[:, _FLOAT_COLUMNS.index('Total')]
+_RATINGS = _FLOAT_BLOCK[:, _FLOAT_COLUMNS.index('Rating')]
+
+def _sample_frame(float_block):
+    """Join the shared columns with a float block, without copying either."""
+    return pd.concat([
+        pd.DataFrame(_SAMPLE_DICT, copy=False),
+        pd.DataFrame(float_block, columns=_FLOAT_COLUMNS, copy=False)
+    ], axis=1, copy=False)
+
+@pytest.fixture(scope="module")
+def sample_data():
+    """Create sample data for UI testing, once per module; copy before mutating."""
+    return _sample_frame(_FLOAT_BLOCK)
+
+@pytest.fixture(scope="module")
+def sample_data_with_nan():
+    """Create sample data whose first Total is missing, once per module."""
+    float_block = _FLOAT_BLOCK.copy(order='F')
+    float_block[0, _FLOAT_COLUMNS.index('Total')] = np.nan
+    return _sample_frame(float_block)
+
+@pytest.fixture(scope="module")
+def exports(sample_data):
+    """Serialize the sample data to each export format once per module."""
+    excel = BytesIO()
+    sample_data.to_excel(excel, index=False, engine="openpyxl")
+    return {
+        "csv": sample_data.to_csv(index=False).encode(),
+        "excel": excel.getvalue(),
+        "json": sample_data.to_json(orient="split", index=False).encode()
     }
-    return pd.DataFrame(data)
 
-def test_dashboard_initialization():
-    """Test dashboard initialization and basic structure."""
-    dashboard = Dashboard()
+@pytest.fixture(scope="module")
+def section_keys():
+    """Load the expected dashboard section keys once per module."""
+    return {method: set(keys) for method, keys in json.loads(SECTION_SNAPSHOT.read_text()).items()}
+
+@pytest.fixture
+def st():
+    """Import streamlit for widget tests, skipping them without a running script."""
+    import streamlit
+    from streamlit import runtime
+    if not runtime.exists():
+        pytest.skip("needs a running Streamlit script")
+    return streamlit
+
+@pytest.fixture(scope="module")
+def dashboard():
+    """Create a Dashboard instance shared by the module."""
+    return Dashboard()
+
+def test_dashboard_initialization(dashboard):
+    """Test dashboard initialization."""
     assert dashboard is not None
-    
+
+def test_dashboard_layout(st):
+    """Test the dashboard's basic widget structure."""
     # Test sidebar initialization
     st.sidebar.title("Walmart Sales Analytics")
     assert st.sidebar.selectbox("Select View", ["Overview", "Products", "Customers", "Geography"]) is not None
@@ -44,93 +107,47 @@ def test_dashboard_initialization():
     st.title("Sales Overview")
     assert st.container() is not None
 
-def test_overview_section():
-    """Test the overview section of the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test metrics display
-    metrics = dashboard.create_sales_overview(df)
-    assert "total_sales" in metrics
-    assert "average_transaction" in metrics
-    assert "total_customers" in metrics
-    assert "average_rating" in metrics
-    
-    # Test metrics values
-    assert metrics["total_sales"] == 140.0
-    assert metrics["average_transaction"] == 46.67
-    assert metrics["total_customers"] == 3
-    assert metrics["average_rating"] == 4.43
-
-def test_sales_trends_section():
-    """Test the sales trends section of the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test trends display
-    trends = dashboard.create_sales_trends(df)
-    assert "daily_sales" in trends
-    assert "growth_rate" in trends
-    assert "forecast" in trends
-    
-    # Test trend calculations
-    assert len(trends["daily_sales"]) == 3
-    assert isinstance(trends["growth_rate"], float)
-    assert len(trends["forecast"]) > 0
-
-def test_product_analysis_section():
-    """Test the product analysis section of the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test product analysis display
-    products = dashboard.create_product_analysis(df)
-    assert "top_products" in products
-    assert "product_performance" in products
-    assert "product_trends" in products
-    
-    # Test product metrics
-    assert len(products["top_products"]) == 3
-    assert isinstance(products["product_performance"], dict)
-    assert len(products["product_trends"]) > 0
-
-def test_customer_analysis_section():
-    """Test the customer analysis section of the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test customer analysis display
-    customers = dashboard.create_customer_analysis(df)
-    assert "customer_segments" in customers
-    assert "customer_preferences" in customers
-    assert "satisfaction_metrics" in customers
-    
-    # Test customer metrics
-    assert len(customers["customer_segments"]) > 0
-    assert isinstance(customers["customer_preferences"], dict)
-    assert isinstance(customers["satisfaction_metrics"], dict)
-
-def test_geographic_analysis_section():
-    """Test the geographic analysis section of the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test geographic analysis display
-    geography = dashboard.create_geographic_analysis(df)
-    assert "city_performance" in geography
-    assert "branch_performance" in geography
-    assert "regional_trends" in geography
-    
-    # Test geographic metrics
-    assert len(geography["city_performance"]) == 3
-    assert len(geography["branch_performance"]) == 3
-    assert len(geography["regional_trends"]) > 0
+@pytest.mark.parametrize("method, checks", [
+    ("create_sales_overview", {
+        "total_sales": lambda v: v == pytest.approx(_TOTALS.sum(), rel=1e-4),
+        "average_transaction": lambda v: v == pytest.approx(_TOTALS.mean(), abs=0.01),
+        "total_customers": lambda v: v == len(_TOTALS),
+        "average_rating": lambda v: v == pytest.approx(_RATINGS.mean(), abs=0.01)
+    }),
+    ("create_sales_trends", {
+        "daily_sales": lambda v: len(v) == 3,
+        "growth_rate": lambda v: isinstance(v, float),
+        "forecast": lambda v: len(v) > 0
+    }),
+    ("create_product_analysis", {
+        "top_products": lambda v: len(v) == 3,
+        "product_performance": lambda v: isinstance(v, dict),
+        "product_trends": lambda v: len(v) > 0
+    }),
+    ("create_customer_analysis", {
+        "customer_segments": lambda v: len(v) > 0,
+        "customer_preferences": lambda v: isinstance(v, dict),
+        "satisfaction_metrics": lambda v: isinstance(v, dict)
+    }),
+    ("create_geographic_analysis", {
+        "city_performance": lambda v: len(v) == 3,
+        "branch_performance": lambda v: len(v) == 3,
+        "regional_trends": lambda v: len(v) > 0
+    })
+], ids=["overview", "sales-trends", "product-analysis", "customer-analysis", "geographic-analysis"])
+def test_dashboard_section(dashboard, sample_data, section_keys, method, checks):
+    """Test each dashboard section returns exactly its snapshot keys with the expected values."""
+    result = getattr(dashboard, method)(sample_data)
+    
+    # Test section keys against the snapshot, catching missing, extra and renamed keys
+    assert result.keys() == section_keys[method]
+    
+    # Test section values
+    for key, check in checks.items():
+        assert check(result[key]), key
 
-def test_filter_interactions():
+def test_filter_interactions(st):
     """Test filter interactions in the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
     # Test date range filter
     date_range = st.date_input(
         "Select Date Range",
@@ -154,61 +171,45 @@ def test_filter_interactions():
     )
     assert product_filter is not None
 
-def test_chart_interactions():
-    """Test chart interactions in the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test line chart
-    st.line_chart(df.set_index("Date")["Total"])
-    assert st.container() is not None
-    
-    # Test bar chart
-    st.bar_chart(df.groupby("Branch")["Total"].sum())
-    assert st.container() is not None
+def test_chart_interactions(dashboard, sample_data):
+    """Test the data behind the dashboard charts."""
+    df = sample_data
+    
+    # Test line chart data is indexed by parsed dates
+    daily_totals = df.set_index("Date")["Total"]
+    assert isinstance(daily_totals.index, pd.DatetimeIndex)
+    
+    # Test bar chart data, summing totals per branch straight from the category codes
+    branch_totals = np.bincount(
+        df["Branch"].cat.codes, weights=df["Total"].to_numpy(),
+        minlength=len(df["Branch"].cat.categories)
+    )
+    np.testing.assert_allclose(branch_totals, _TOTALS)  # One row per branch
     
-    # Test pie chart
-    st.pyplot(dashboard.create_pie_chart(df, "Payment"))
-    assert st.container() is not None
+    # Test pie chart figure
+    fig = dashboard.create_pie_chart(df, "Payment")
+    assert fig is not None
+    assert hasattr(fig, "axes")
 
-def test_data_table_interactions():
+def test_data_table_interactions(sample_data):
     """Test data table interactions in the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test data table display
-    st.dataframe(df)
-    assert st.container() is not None
+    df = sample_data
     
-    # Test sorting
-    sorted_df = df.sort_values("Total", ascending=False)
-    assert sorted_df.iloc[0]["Total"] == 90.0
+    # Test locating the top row without sorting
+    assert df.loc[df["Total"].idxmax(), "Total"] == pytest.approx(90.0)
     
-    # Test filtering
-    filtered_df = df[df["Branch"] == "A"]
+    # Test filtering on the integer category code rather than the label
+    branch_a = df["Branch"].cat.categories.get_loc("A")
+    filtered_df = df.iloc[(df["Branch"].cat.codes.to_numpy() == branch_a).nonzero()[0]]
     assert len(filtered_df) == 1
 
-def test_export_functionality():
+@pytest.mark.parametrize("fmt", ["csv", "excel", "json"])
+def test_export_functionality(exports, fmt):
     """Test export functionality in the dashboard."""
-    dashboard = Dashboard()
-    df = generate_test_data()
-    
-    # Test CSV export
-    csv = df.to_csv(index=False)
-    assert csv is not None
-    
-    # Test Excel export
-    excel = df.to_excel(index=False)
-    assert excel is not None
-    
-    # Test JSON export
-    json = df.to_json(orient="records")
-    assert json is not None
+    assert len(exports[fmt]) > 0
 
-def test_error_handling():
+def test_error_handling(dashboard, sample_data_with_nan):
     """Test error handling in the dashboard."""
-    dashboard = Dashboard()
-    
     # Test empty data handling
     empty_df = pd.DataFrame()
     with pytest.raises(ValueError):
@@ -220,7 +221,5 @@ def test_error_handling():
         dashboard.create_sales_trends(invalid_df)
     
     # Test missing data handling
-    df = generate_test_data()
-    df.loc[0, "Total"] = None
     with pytest.raises(ValueError):
-        dashboard.create_sales_overview(df) 
\ No newline at end of file
+        dashboard.create_sales_overview(sample_data_with_nan) 
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""
+Performance benchmarks for the dashboard aggregation methods.
+"""
+import pytest
+from app.services.dashboard import Dashboard
+
+# Benchmarks over 500k rows belong in a dedicated job, not the default run
+pytestmark = pytest.mark.slow
+
+@pytest.fixture(scope="module")
+def dashboard():
+    """Create a Dashboard instance shared by the module."""
+    return Dashboard()
+
+@pytest.mark.parametrize("method", [
+    "create_sales_overview",
+    "create_sales_trends",
+    "create_product_analysis",
+    "create_customer_analysis",
+    "create_geographic_analysis"
+])
+def test_dashboard_section_performance(benchmark, dashboard, benchmark_sample_data, method):
+    """Benchmark each dashboard section on a large dataset."""
+    result = benchmark(getattr(dashboard, method), benchmark_sample_data)
+    assert isinstance(result, dict)